@@ -4,6 +4,8 @@ from utils.baseapi import BaseAPI
 class LibbyAPI(BaseAPI):
     """Kirjastot.fi API client."""
 
+    http_cache = True
+
     def __init__(self):
         super().__init__("https://api.kirjastot.fi/v4")
 
@@ -1,5 +1,7 @@
 import json
 import re
+from datetime import timedelta
+
 from utils.basescraper import BaseScraper
 from utils.cache import cache_output
 
@@ -8,16 +10,25 @@ from .config import AukiConfig
 from .schema import LibraryData, RawData
 
 
-@cache_output("library_raw", LibraryData)
+# Library schedules cover the next two weeks and rarely change.
+@cache_output(
+    "library_raw",
+    LibraryData,
+    ttl=timedelta(days=3),
+    stale_while_revalidate=True,
+    key=lambda params: params.library_id,
+)
 def fetch_library(params: AukiConfig) -> LibraryData:
     api = LibbyAPI()
 
     response = api.get_open_hours(params.library_id)
+    if not response.ok:
+        raise RuntimeError(f"Library request failed with status {response.status}")
 
     return LibraryData(**response.data["data"])
 
 
-@cache_output("pharmacy_ya", str)
+@cache_output("pharmacy_ya", str, key=lambda params: [params.location_id, params.css_selector])
 def fetch_pharmacy_ya(params: AukiConfig) -> str:
     api = BaseScraper("https://www.yliopistonapteekki.fi")
 
@@ -26,7 +37,7 @@ def fetch_pharmacy_ya(params: AukiConfig) -> str:
     return extracted_text
 
 
-@cache_output("krauta_raw", dict)
+@cache_output("krauta_raw", dict, key=lambda params: params.krauta_url)
 def fetch_krauta(params: AukiConfig) -> dict:
     """Fetch K-Rauta opening hours from HTML table"""
     from bs4 import BeautifulSoup
@@ -35,7 +46,7 @@ def fetch_krauta(params: AukiConfig) -> dict:
     response = scraper.request("GET", "", useJSON=False)
 
     if not response.ok:
-        return {}
+        raise RuntimeError(f"K-Rauta request failed with status {response.status}")
 
     soup = BeautifulSoup(response.data, "html.parser")
 
@@ -60,7 +71,16 @@ def fetch_krauta(params: AukiConfig) -> dict:
     return {"opening_hours": opening_hours, "name": "K-Rauta Passeli"} if opening_hours else {}
 
 
-@cache_output("auki_raw", RawData)
+@cache_output(
+    "auki_raw",
+    RawData,
+    key=lambda params: [
+        params.library_id,
+        params.location_id,
+        params.css_selector,
+        params.krauta_url,
+    ],
+)
 def fetch_combined(params: AukiConfig) -> RawData:
     """Fetch library, pharmacy and K-Rauta data and return combined results"""
     library_data = None
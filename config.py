@@ -1,15 +1,24 @@
 import json
-from typing import Callable, Type, Optional, Dict, Any, TypeVar
+import importlib
+from typing import Callable, Type, Optional, Dict, Any, TypeVar, List, Iterable, TYPE_CHECKING
 from dataclasses import dataclass
 from functools import wraps
-
-from pydantic import ValidationError
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 from utils.logging import Log
-from utils.schema import JSONModel
-from utils.schema_formatter import format_schema
+from utils.tracing import span
 from utils.paths import config_exists, get_config_path
-from utils.constants import DEFAULT_OUTPUT_DIR, DEFAULT_CACHE_DIR, DEFAULT_CONFIG_DIR
+from utils.constants import (
+    DEFAULT_OUTPUT_DIR,
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CONFIG_DIR,
+    DEFAULT_CACHE_STORE,
+)
+
+# Keep the CLI cold start light: pydantic and the runner modules are imported on demand.
+if TYPE_CHECKING:
+    from utils.schema import JSONModel
 
 
 @dataclass
@@ -20,16 +29,43 @@ class CliConfig:
     cache_dir: str = DEFAULT_CACHE_DIR
     ignore_cache: bool = False
     config_dir: str = DEFAULT_CONFIG_DIR
+    cache_store: str = DEFAULT_CACHE_STORE
+
+
+@dataclass(frozen=True)
+class RunnerManifest:
+    """Runner entry that is known without importing the runner's module."""
 
+    module: str
+    description: str
+
+
+# Manifest of all runners. A runner's module is imported (and the runner registered)
+# only when it is executed or its schema is shown.
+RUNNER_MANIFEST: Dict[str, RunnerManifest] = {
+    "auki": RunnerManifest("auki.runners", "Opening hours aggregator for common services"),
+    "swimmi": RunnerManifest("swimmi.runners", "Human-readable swimming pool schedule"),
+    "tori": RunnerManifest("tori.runners", "Local event calendar"),
+    "leffa": RunnerManifest(
+        "leffa.runners", "Fetch and render movie listings from multiple theaters"
+    ),
+    "koje": RunnerManifest("koje.runners", "Main dashboard container application"),
+    "saa": RunnerManifest("saa.runners", "Generate weather forecast page for Salo"),
+    "uutta": RunnerManifest("uutta.runners", "Local news aggregator"),
+}
 
 # Global registry for all runners
 RUNNERS_REGISTRY: Dict[str, Dict[str, Any]] = {}
 
-# Global CLI context - holds the current CliConfig instance
+# Global CLI context - holds the process-wide default CliConfig instance
 CLI_CONTEXT: CliConfig = CliConfig()
 
+# Per-execution CLI context. Each runner execution binds its own snapshot here, so
+# concurrently executing runners never see each other's (or later) context changes.
+_EXECUTION_CONTEXT: ContextVar[Optional[CliConfig]] = ContextVar("execution_context", default=None)
+
 # Type variable for JSONModel subclasses
-T = TypeVar("T", bound=JSONModel)
+T = TypeVar("T", bound="JSONModel")
 
 
 class RunnerInfo:
@@ -40,6 +76,8 @@ class RunnerInfo:
         self.function = info["function"]
         self.config_class = info["config_class"]
         self.description = info["description"]
+        self.depends_on = info["depends_on"]
+        self.refresh_minutes = info["refresh_minutes"]
 
 
 def set_cli_context(
@@ -47,6 +85,7 @@ def set_cli_context(
     cache_dir: str,
     ignore_cache: bool = False,
     config_dir: str = DEFAULT_CONFIG_DIR,
+    cache_store: str = DEFAULT_CACHE_STORE,
 ):
     """Set global CLI context parameters."""
     global CLI_CONTEXT
@@ -55,32 +94,47 @@ def set_cli_context(
         cache_dir=cache_dir,
         ignore_cache=ignore_cache,
         config_dir=config_dir,
+        cache_store=cache_store,
     )
 
 
+def get_cli_context() -> CliConfig:
+    """Get the CLI context of the current execution, falling back to the global one."""
+    return _EXECUTION_CONTEXT.get() or CLI_CONTEXT
+
+
 def get_output_dir() -> str:
     """Get the current output directory."""
-    return CLI_CONTEXT.output_dir
+    return get_cli_context().output_dir
 
 
 def get_cache_dir() -> str:
     """Get the current cache directory."""
-    return CLI_CONTEXT.cache_dir
+    return get_cli_context().cache_dir
 
 
 def should_ignore_cache() -> bool:
     """Get whether to ignore cache."""
-    return CLI_CONTEXT.ignore_cache
+    return get_cli_context().ignore_cache
 
 
-def register_runner(name: str, config_class: Type[T], description: str = ""):
+def register_runner(
+    name: str,
+    config_class: Type[T],
+    description: str = "",
+    depends_on: Iterable[str] = (),
+    refresh_minutes: Optional[Iterable[int]] = None,
+):
     """
     Decorator to register a runner function with its configuration schema.
 
     Args:
         name: Unique name for the runner (used in CLI)
         config_class: Pydantic model class for validating parameters
-        description: Optional description for the runner
+        description: Optional description for the runner, defaults to its manifest entry
+        depends_on: Names of runners that must finish before this one when executing all
+        refresh_minutes: Minutes past each hour at which the rendered page auto-refreshes,
+            used by the scheduler to have fresh pages on disk just before that
     """
 
     def decorator(func: Callable[[T], None]):
@@ -90,7 +144,9 @@ def register_runner(name: str, config_class: Type[T], description: str = ""):
         RUNNERS_REGISTRY[name] = {
             "function": func,
             "config_class": config_class,
-            "description": description or func.__doc__ or "",
+            "description": description or _manifest_description(name) or func.__doc__ or "",
+            "depends_on": tuple(depends_on),
+            "refresh_minutes": tuple(refresh_minutes) if refresh_minutes else None,
         }
 
         @wraps(func)
@@ -102,6 +158,12 @@ def register_runner(name: str, config_class: Type[T], description: str = ""):
     return decorator
 
 
+def _manifest_description(name: str) -> str:
+    """Get the description of a runner from the manifest, the single source for it."""
+    manifest = RUNNER_MANIFEST.get(name)
+    return manifest.description if manifest else ""
+
+
 def get_runner_default_config(runner_name: str) -> Optional[str]:
     """
     Get the default config path for a runner if it exists.
@@ -110,14 +172,32 @@ def get_runner_default_config(runner_name: str) -> Optional[str]:
     if not get_runner_info(runner_name):
         return None
 
-    if config_exists(runner_name, CLI_CONTEXT.config_dir):
-        return get_config_path(runner_name, CLI_CONTEXT.config_dir)
+    config_dir = get_cli_context().config_dir
+    if config_exists(runner_name, config_dir):
+        return get_config_path(runner_name, config_dir)
 
     return None
 
 
-def execute_runner(runner_name: str, config_path: str) -> bool:
-    """Execute a single runner with the given configuration. Returns True if successful."""
+def execute_runner(runner_name: str, config_path: str, context: Optional[CliConfig] = None) -> bool:
+    """
+    Execute a single runner with the given configuration. Returns True if successful.
+
+    The runner sees `context` (default: a snapshot of the current context) for its whole
+    run, regardless of what other threads do with the global context meanwhile.
+    """
+    token = _EXECUTION_CONTEXT.set(context or get_cli_context())
+    try:
+        with span(runner_name, "runner", config=config_path) as trace:
+            trace["success"] = _execute_runner(runner_name, config_path)
+            return trace["success"]
+    finally:
+        _EXECUTION_CONTEXT.reset(token)
+
+
+def _execute_runner(runner_name: str, config_path: str) -> bool:
+    import pydantic
+
     runner_info = get_runner_info(runner_name)
     if not runner_info:
         Log.error("Unknown runner: %s", runner_name)
@@ -146,7 +226,7 @@ def execute_runner(runner_name: str, config_path: str) -> bool:
         Log.info("  python main.py runners %s", runner_name)
         return False
 
-    except ValidationError as err:
+    except pydantic.ValidationError as err:
         Log.error("Configuration validation failed for runner '%s':", runner_name)
         for e in err.errors():
             Log.error("  %s: %s", ".".join(str(p) for p in e.get("loc", [])), e.get("msg"))
@@ -161,7 +241,7 @@ def execute_runner(runner_name: str, config_path: str) -> bool:
         return False
 
 
-def execute_all_runners() -> bool:
+def execute_all_runners(jobs: int = 1) -> bool:
     """
     Execute all registered runners that have config files.
     Returns True if all successful, False if any failed.
@@ -171,43 +251,168 @@ def execute_all_runners() -> bool:
         Log.info("No runners registered. Make sure to import all modules.")
         return False
 
-    all_success = True
+    success = execute_runners(list(runners.keys()), jobs)
+
+    Log.info("All runners execution completed")
+    return success
+
+
+def execute_runners(runner_names: List[str], jobs: int = 1) -> bool:
+    """
+    Execute the given runners that have config files.
+
+    Runners are started in dependency order. With `jobs` > 1, independent runners are
+    executed concurrently in a thread pool of that size.
+    Returns True if all successful, False if any failed.
+    """
+    context = get_cli_context()
+    config_paths: Dict[str, str] = {}
 
-    for runner_name in runners.keys():
-        if not config_exists(runner_name, CLI_CONTEXT.config_dir):
-            config_path = get_config_path(runner_name, CLI_CONTEXT.config_dir)
+    for runner_name in runner_names:
+        config_path = get_config_path(runner_name, context.config_dir)
+        if not config_exists(runner_name, context.config_dir):
             Log.warning(f"Skipping runner '{runner_name}': config file not found at {config_path}")
             continue
 
-        Log.info(f"Executing runner: {runner_name}")
+        config_paths[runner_name] = config_path
+
+    try:
+        order = _resolve_execution_order(list(config_paths.keys()))
+    except ValueError as e:
+        Log.error(str(e))
+        return False
 
-        config_path = get_config_path(runner_name, CLI_CONTEXT.config_dir)
-        success = execute_runner(runner_name, config_path)
+    if jobs > 1:
+        results = _execute_concurrently(order, config_paths, jobs, context)
+    else:
+        results = {}
+        for runner_name in order:
+            Log.info(f"Executing runner: {runner_name}")
+            results[runner_name] = execute_runner(runner_name, config_paths[runner_name], context)
+            _log_runner_result(runner_name, results[runner_name])
 
-        if not success:
-            all_success = False
-            Log.error(f"Runner '{runner_name}' failed")
-        else:
-            Log.info(f"Runner '{runner_name}' completed successfully")
+    return all(results.values())
 
-    Log.info("All runners execution completed")
-    return all_success
+
+def _runner_dependencies(runner_name: str, candidates: Iterable[str]) -> List[str]:
+    """Dependencies of a runner among the given candidates. Others are considered satisfied."""
+    runner_info = get_runner_info(runner_name)
+    if not runner_info:
+        return []
+
+    return [dep for dep in runner_info.depends_on if dep in candidates]
+
+
+def _resolve_execution_order(runner_names: List[str]) -> List[str]:
+    """Order runners so that dependencies come first, otherwise keeping registration order."""
+    order: List[str] = []
+    remaining = list(runner_names)
+
+    while remaining:
+        ready = [
+            name
+            for name in remaining
+            if all(dep in order for dep in _runner_dependencies(name, runner_names))
+        ]
+        if not ready:
+            raise ValueError(f"Circular runner dependencies between: {', '.join(remaining)}")
+
+        order.extend(ready)
+        remaining = [name for name in remaining if name not in ready]
+
+    return order
+
+
+def _execute_concurrently(
+    order: List[str], config_paths: Dict[str, str], jobs: int, context: CliConfig
+) -> Dict[str, bool]:
+    """Execute runners in a thread pool, starting each one as soon as its dependencies are done."""
+    results: Dict[str, bool] = {}
+    pending = list(order)
+    running = {}
+
+    Log.info(f"Executing {len(order)} runners with {jobs} parallel jobs")
+
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="runner") as pool:
+        while pending or running:
+            for runner_name in list(pending):
+                dependencies = _runner_dependencies(runner_name, order)
+                if not all(dep in results for dep in dependencies):
+                    continue
+
+                failed = [dep for dep in dependencies if not results[dep]]
+                if failed:
+                    Log.warning(f"Runner '{runner_name}' continues despite failed: {failed}")
+
+                Log.info(f"Executing runner: {runner_name}")
+                pending.remove(runner_name)
+                future = pool.submit(
+                    execute_runner, runner_name, config_paths[runner_name], context
+                )
+                running[future] = runner_name
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                runner_name = running.pop(future)
+                results[runner_name] = future.result()
+                _log_runner_result(runner_name, results[runner_name])
+
+    return results
+
+
+def _log_runner_result(runner_name: str, success: bool):
+    if not success:
+        Log.error(f"Runner '{runner_name}' failed")
+    else:
+        Log.info(f"Runner '{runner_name}' completed successfully")
+
+
+def resolve_runner(name: str) -> bool:
+    """Import the module of a runner from the manifest, registering it. Returns True if registered."""
+    if name in RUNNERS_REGISTRY:
+        return True
+
+    manifest = RUNNER_MANIFEST.get(name)
+    if not manifest:
+        return False
+
+    try:
+        importlib.import_module(manifest.module)
+    except Exception as e:
+        Log.exception(
+            "Failed to load runner '%s' from %s: %s", name, manifest.module, e, exc_info=e
+        )
+        return False
+
+    return name in RUNNERS_REGISTRY
+
+
+def resolve_all_runners():
+    """Import the modules of all runners in the manifest, e.g. for a long-running process."""
+    for name in RUNNER_MANIFEST:
+        resolve_runner(name)
 
 
 def get_runner_info(name: str) -> Optional[RunnerInfo]:
-    """Get information about a specific runner"""
-    if name not in RUNNERS_REGISTRY:
+    """Get information about a specific runner, loading its module if needed"""
+    if not resolve_runner(name):
         return None
     return RunnerInfo(name, RUNNERS_REGISTRY[name])
 
 
 def list_runners() -> Dict[str, str]:
-    """List all registered runners with their descriptions"""
-    return {name: info["description"] for name, info in RUNNERS_REGISTRY.items()}
+    """List all known runners with their descriptions, without loading their modules"""
+    runners = {name: manifest.description for name, manifest in RUNNER_MANIFEST.items()}
+    for name, info in RUNNERS_REGISTRY.items():
+        runners.setdefault(name, info["description"])
+
+    return runners
 
 
 def format_runner_schema(name: str) -> Optional[str]:
     """Transform JSON Schema into a simple human-readable format"""
+    from utils.schema_formatter import format_schema
+
     runner_info = get_runner_info(name)
     if not runner_info:
         return None
@@ -6,8 +6,11 @@ from utils.renderers import render_html, save_file
 from utils.logging import Log
 from .config import KojeConfig
 
+# Apps embedded in the dashboard, built first so their pages exist when koje is done.
+EMBEDDED_APPS = ("auki", "swimmi", "tori", "leffa", "saa", "uutta")
 
-@register_runner("koje", KojeConfig, "Main dashboard container application")
+
+@register_runner("koje", KojeConfig, depends_on=EMBEDDED_APPS)
 def run_koje(params: KojeConfig):
     """Generate the main dashboard container application"""
 
@@ -0,0 +1,30 @@
+from utils.baseapi import BaseAPI
+
+
+class NexxoAPI(BaseAPI):
+    """Nexxo Scope API client, used by the theaters' WordPress sites."""
+
+    timeout = 30
+
+    def __init__(self, api_url: str):
+        super().__init__(api_url)
+
+    def get_daily_shows(
+        self, location_id: int, upcoming_only: bool, content_type_id: int, language: str
+    ):
+        return self.request(
+            "GET",
+            "/wp-content/plugins/nexxo-scope/public_api.php",
+            {
+                "params": {
+                    "locationid": location_id,
+                    "action": "exportdailyshows",
+                    "upcoming": str(upcoming_only).lower(),
+                    "showtype": -1,
+                    "roomid": -1,
+                    "contenttypeid": content_type_id,
+                    "lang": language,
+                    "languagecode": "",
+                },
+            },
+        )
@@ -1,6 +1,6 @@
-import requests
 import logging
 from typing import Dict, Any, List
+from .api import NexxoAPI
 from .config import LeffaConfig, TheaterConfig
 
 logger = logging.getLogger(__name__)
@@ -8,32 +8,22 @@ logger = logging.getLogger(__name__)
 
 def fetch_theater_movies(theater: TheaterConfig) -> Dict[str, Any]:
     """Fetch movie data from a theater's API using the daily shows endpoint."""
-    url = f"{theater.api_url}/wp-content/plugins/nexxo-scope/public_api.php"
-    params = {
-        "locationid": theater.location_id,
-        "action": "exportdailyshows",
-        "upcoming": str(theater.upcoming_only).lower(),
-        "showtype": -1,
-        "roomid": -1,
-        "contenttypeid": theater.content_type_id,
-        "lang": theater.language,
-        "languagecode": "",
-    }
-
-    try:
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-
-        data = response.json()
-        logger.info(f"Fetched movie data for {theater.name} with {len(data.get('shows', {}))} days")
-        return data
-
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Failed to fetch movie data for {theater.name}: {e}")
-        raise
-    except Exception as e:
-        logger.error(f"Failed to parse movie data for {theater.name}: {e}")
-        raise
+    api = NexxoAPI(theater.api_url)
+
+    response = api.get_daily_shows(
+        theater.location_id,
+        theater.upcoming_only,
+        theater.content_type_id,
+        theater.language,
+    )
+
+    if not response.ok:
+        logger.error(f"Failed to fetch movie data for {theater.name}: {response.data}")
+        raise RuntimeError(f"Movie data request failed with status {response.status}")
+
+    data = response.data
+    logger.info(f"Fetched movie data for {theater.name} with {len(data.get('shows', {}))} days")
+    return data
 
 
 def fetch_movies(config: LeffaConfig) -> List[Dict[str, Any]]:
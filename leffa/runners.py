@@ -2,6 +2,7 @@ import logging
 import os
 from config import register_runner, get_output_dir
 from utils.renderers import render_html, save_file
+from utils.tracing import span
 from .config import LeffaConfig
 from .fetch import fetch_movies
 from .transform import transform_movies
@@ -9,7 +10,7 @@ from .transform import transform_movies
 logger = logging.getLogger(__name__)
 
 
-@register_runner("leffa", LeffaConfig, "Fetch and render movie listings from multiple theaters")
+@register_runner("leffa", LeffaConfig)
 def run_leffa_multi(params: LeffaConfig):
     """Complete ETL pipeline for multiple theater movie listings."""
 
@@ -17,11 +18,13 @@ def run_leffa_multi(params: LeffaConfig):
 
     # Fetch raw movie data from all theaters
     logger.info(f"Fetching movie data from {len(params.theaters)} theaters")
-    all_theater_data = fetch_movies(params)
+    with span("fetch"):
+        all_theater_data = fetch_movies(params)
 
     # Transform data into structured format
     logger.info("Transforming movie data")
-    movie_data = transform_movies(all_theater_data, params)
+    with span("transform"):
+        movie_data = transform_movies(all_theater_data, params)
 
     # Render to HTML
     logger.info("Rendering movie listings to HTML")
@@ -2,8 +2,18 @@
 import sys
 import argparse
 
-from utils.devserver import host_dev_server
-from utils.constants import DEFAULT_OUTPUT_DIR, DEFAULT_CACHE_DIR, DEFAULT_DEV_PORT
+from utils.tracing import enable_tracing, write_trace
+from utils.constants import (
+    DEFAULT_OUTPUT_DIR,
+    DEFAULT_CACHE_DIR,
+    DEFAULT_DEV_PORT,
+    DEFAULT_SCHEDULER_LEAD_SECONDS,
+    DEFAULT_CACHE_STORE,
+    DEFAULT_CACHE_MAX_MB,
+    DEFAULT_CACHE_MAX_AGE_DAYS,
+    DEFAULT_HTTP_POOL_HOSTS,
+    DEFAULT_HTTP_POOL_SIZE,
+)
 from config import (
     list_runners,
     format_runner_schema,
@@ -13,14 +23,35 @@ from config import (
     execute_all_runners,
 )
 
-# Import all runner modules to register individual runner functions
-import auki.runners  # noqa
-import swimmi.runners  # noqa
-import tori.runners  # noqa
-import leffa.runners  # noqa
-import koje.runners  # noqa
-import saa.runners  # noqa
-import uutta.runners  # noqa
+# Runner modules are listed in `config.RUNNER_MANIFEST` and imported only when needed.
+
+
+def add_http_arguments(parser: argparse.ArgumentParser):
+    """Add the options of the shared HTTP connection pools."""
+    parser.add_argument(
+        "--http-pool-hosts",
+        type=int,
+        default=DEFAULT_HTTP_POOL_HOSTS,
+        help=f"Number of per-host connection pools kept open at once (default: {DEFAULT_HTTP_POOL_HOSTS})",
+    )
+    parser.add_argument(
+        "--http-pool-size",
+        type=int,
+        default=DEFAULT_HTTP_POOL_SIZE,
+        help=f"Reusable connections per host (default: {DEFAULT_HTTP_POOL_SIZE})",
+    )
+    parser.add_argument(
+        "--no-keep-alive",
+        action="store_true",
+        help="Close connections after each request instead of reusing them",
+    )
+
+
+def configure_http(args):
+    """Set up the shared HTTP connection pools, before any API client is created."""
+    from utils.connections import configure_connection_pools
+
+    configure_connection_pools(args.http_pool_hosts, args.http_pool_size, not args.no_keep_alive)
 
 
 def create_parser():
@@ -48,11 +79,123 @@ def create_parser():
         default=DEFAULT_CACHE_DIR,
         help=f"Cache directory for storing temporary data (default: {DEFAULT_CACHE_DIR})",
     )
+    runners_parser.add_argument(
+        "--cache-store",
+        choices=["sqlite", "files"],
+        default=DEFAULT_CACHE_STORE,
+        help=f"Storage engine for cached data (default: {DEFAULT_CACHE_STORE})",
+    )
     runners_parser.add_argument(
         "--ignore-cache",
         action="store_true",
         help="Force redownload of all data, ignoring existing cache",
     )
+    runners_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of runners to execute in parallel when running 'all' (default: 1)",
+    )
+    cassette_group = runners_parser.add_mutually_exclusive_group()
+    cassette_group.add_argument(
+        "--record",
+        metavar="DIR",
+        help="Save every upstream response into DIR, bypassing all caches",
+    )
+    cassette_group.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="Answer upstream requests from responses recorded into DIR, without network access",
+    )
+    runners_parser.add_argument(
+        "--replay-latency-ms",
+        type=float,
+        default=0,
+        help="Delay each replayed response by this long (default: 0)",
+    )
+    runners_parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="Write upstream request metrics to FILE in OpenMetrics text format",
+    )
+    runners_parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Write per-phase timing spans to FILE in Chrome trace-event format",
+    )
+    add_http_arguments(runners_parser)
+
+    # Scheduler subcommand
+    scheduler_parser = subparsers.add_parser(
+        "serve-scheduler", help="Keep executing runners on their schedules in one warm process"
+    )
+    scheduler_parser.add_argument(
+        "--output-dir",
+        default=DEFAULT_OUTPUT_DIR,
+        help=f"Base output directory for generated files (default: {DEFAULT_OUTPUT_DIR})",
+    )
+    scheduler_parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Cache directory for storing temporary data (default: {DEFAULT_CACHE_DIR})",
+    )
+    scheduler_parser.add_argument(
+        "--cache-store",
+        choices=["sqlite", "files"],
+        default=DEFAULT_CACHE_STORE,
+        help=f"Storage engine for cached data (default: {DEFAULT_CACHE_STORE})",
+    )
+    scheduler_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of runners to execute in parallel when several are due (default: 1)",
+    )
+    scheduler_parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="Rewrite FILE with upstream request metrics after each round of runners",
+    )
+    scheduler_parser.add_argument(
+        "--lead-seconds",
+        type=int,
+        default=DEFAULT_SCHEDULER_LEAD_SECONDS,
+        help=f"Execute runners this long before their pages refresh (default: {DEFAULT_SCHEDULER_LEAD_SECONDS})",
+    )
+    add_http_arguments(scheduler_parser)
+
+    # Cache subcommand
+    cache_parser = subparsers.add_parser("cache", help="Inspect and prune cached data")
+    cache_parser.add_argument(
+        "action",
+        choices=["stats", "prune"],
+        help="Show hit ratios, sizes and the oldest entries, or enforce the cache budget",
+    )
+    cache_parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Cache directory for storing temporary data (default: {DEFAULT_CACHE_DIR})",
+    )
+    cache_parser.add_argument(
+        "--cache-store",
+        choices=["sqlite", "files"],
+        default=DEFAULT_CACHE_STORE,
+        help=f"Storage engine for cached data (default: {DEFAULT_CACHE_STORE})",
+    )
+    cache_parser.add_argument(
+        "--max-mb",
+        type=float,
+        default=DEFAULT_CACHE_MAX_MB,
+        help=f"Size budget when pruning, least recently used entries go first (default: {DEFAULT_CACHE_MAX_MB})",
+    )
+    cache_parser.add_argument(
+        "--max-age-days",
+        type=float,
+        default=DEFAULT_CACHE_MAX_AGE_DAYS,
+        help=f"Delete entries older than this when pruning (default: {DEFAULT_CACHE_MAX_AGE_DAYS})",
+    )
 
     # Dev subcommand
     dev_parser = subparsers.add_parser("dev", help="Start development server")
@@ -87,9 +230,27 @@ def handle_runners(args):
         print(f"  {'all':<20} Execute all registered runners")
         return
 
+    set_cli_context(
+        args.output_dir, args.cache_dir, args.ignore_cache, cache_store=args.cache_store
+    )
+    configure_http(args)
+
+    if args.trace:
+        enable_tracing()
+
+    if args.record:
+        from utils.cassette import enable_recording
+
+        enable_recording(args.record)
+    elif args.replay:
+        from utils.cassette import enable_replay
+
+        enable_replay(args.replay, args.replay_latency_ms)
+
     # Handle special "all" runner
     if args.runner_name == "all":
-        success = execute_all_runners()
+        success = execute_all_runners(jobs=args.jobs)
+        finish_build(args)
         sys.exit(0 if success else 1)
 
     config_path = args.params or get_runner_default_config(args.runner_name)
@@ -106,14 +267,52 @@ def handle_runners(args):
 
         # Show schema instead
         schema_display = format_runner_schema(args.runner_name)
-        print(schema_display)
+        if schema_display:
+            print(schema_display)
         sys.exit(1)
 
-    set_cli_context(args.output_dir, args.cache_dir, args.ignore_cache, config_path)
     success = execute_runner(args.runner_name, config_path)
+    finish_build(args)
     sys.exit(0 if success else 1)
 
 
+def finish_build(args):
+    """Write build artifacts requested on the command line and tidy up the cache."""
+    from utils.cachemanager import maintain_cache
+
+    maintain_cache()
+
+    if args.trace:
+        write_trace(args.trace)
+
+    if args.metrics:
+        from utils.metrics import write_metrics
+
+        write_metrics(args.metrics)
+
+
+def handle_cache(args):
+    """Handle the cache subcommand"""
+    from utils.cachestore import get_cache_store
+    from utils.cachemanager import (
+        get_cache_stats,
+        prune_cache,
+        format_cache_stats,
+        remove_legacy_cache_files,
+    )
+
+    store = get_cache_store(args.cache_dir, args.cache_store)
+
+    if args.action == "prune":
+        legacy_count, legacy_size = remove_legacy_cache_files(args.cache_dir)
+        count, size = prune_cache(store, int(args.max_mb * 1024 * 1024), args.max_age_days)
+        count, size = count + legacy_count, size + legacy_size
+        print(f"Deleted {count} entries ({size} bytes)")
+        return
+
+    print(format_cache_stats(get_cache_stats(store)))
+
+
 def main():
     parser = create_parser()
     args = parser.parse_args()
@@ -125,7 +324,21 @@ def main():
     if args.subcommand == "runners":
         return handle_runners(args)
 
+    if args.subcommand == "serve-scheduler":
+        from utils.scheduler import serve_scheduler
+
+        set_cli_context(args.output_dir, args.cache_dir, cache_store=args.cache_store)
+        configure_http(args)
+        return serve_scheduler(
+            jobs=args.jobs, lead_seconds=args.lead_seconds, metrics_file=args.metrics
+        )
+
+    if args.subcommand == "cache":
+        return handle_cache(args)
+
     if args.subcommand == "dev":
+        from utils.devserver import host_dev_server
+
         return host_dev_server(args.directory, args.port)
 
     parser.print_help()
@@ -1,11 +1,17 @@
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+import os
+import re
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple, Union
 
 from utils.baseapi import BaseAPI
 from utils.logging import Log
-from .config import SaaConfig
+from .config import DEFAULT_EPHEMERIS_PATH
 
-from skyfield.api import N, E, wgs84, load
+from skyfield.api import N, E, wgs84, Loader
+from skyfield.jpllib import SpiceKernel
+from skyfield.timelib import Timescale
 from skyfield import almanac
 
 # Constants
@@ -14,13 +20,47 @@ FMI_WEATHER_PARAMETERS = (
 )
 FMI_STORED_QUERY_ID = "fmi::forecast::harmonie::surface::point::timevaluepair"
 
+# The forecast model runs every 3 hours. Once the next run is due, check for it this often.
+FMI_MODEL_RUN_INTERVAL = timedelta(hours=3)
+FMI_MODEL_RUN_RECHECK = timedelta(minutes=15)
+
+# Locations per forecast request. The stored query takes any number of `place` and
+# `latlon` parameters, but responses grow with every location.
+FMI_MAX_LOCATIONS_PER_REQUEST = 10
+
+COORDINATES_PATTERN = re.compile(r"^\s*-?\d+(\.\d+)?\s*,\s*-?\d+(\.\d+)?\s*$")
+
 # Coordinates for Salo, Finland
 SALO = {"lat": 60.3841, "lng": 23.1288}
 
 
+def is_coordinates(place: str) -> bool:
+    """Check whether a place is given as "lat,lon" coordinates instead of a name."""
+    return bool(COORDINATES_PATTERN.match(place))
+
+
+def parse_position(position: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Get (lat, lon) from a station position as given by FMI ("lat lon"), or None."""
+    try:
+        latitude, longitude = map(float, (position or "").split())
+    except ValueError:
+        return None
+    return latitude, longitude
+
+
+# Timescales and ephemerides by path, see get_skyfield_data()
+_ephemerides: Dict[str, Tuple[Timescale, SpiceKernel]] = {}
+_skyfield_lock = threading.Lock()
+
+
 class FMIWeatherAPI(BaseAPI):
     """FMI Weather API client for fetching forecast data."""
 
+    # FMI open data allows 600 requests per 5 minutes in total.
+    rate_limit = 1.0
+    rate_burst = 2
+    max_concurrency = 2
+
     def __init__(self):
         super().__init__("https://opendata.fmi.fi/wfs", {})
 
@@ -42,18 +82,17 @@ class FMIWeatherAPI(BaseAPI):
         total_hours = int((end_of_target_day - start_hour).total_seconds() / 3600)
         return total_hours
 
-    def fetch_forecast(self, config: SaaConfig) -> Optional[str]:
+    def fetch_forecast(self, places: List[str], future_hours: int) -> Optional[bytes]:
         """
-        Fetch weather forecast from FMI API.
-        Returns raw XML string or None if failed.
+        Fetch weather forecast of the next `future_hours` for one or more places from FMI
+        API, in a single request. The time step gets finer for short forecasts.
+        Places are names, or coordinates as "lat,lon". Don't mix the two in one request.
+        Returns raw XML bytes or None if failed.
         """
         try:
-            future_hours = self.calculate_future_hours(config.future_days)
-            Log.info(
-                f"Fetching weather forecast for {config.place} ({future_hours}h, {config.future_days} days)"
-            )
+            Log.info(f"Fetching weather forecast for {', '.join(places)} ({future_hours}h)")
 
-            params = self._build_forecast_params(config, future_hours)
+            params = self._build_forecast_params(places, future_hours)
             response = self.request("GET", "", {"params": params}, useJSON=False)
 
             return self._validate_response(response)
@@ -62,6 +101,29 @@ class FMIWeatherAPI(BaseAPI):
             Log.error(f"Unexpected error fetching weather data: {e}")
             return None
 
+    def fetch_probe(self, place: str) -> Optional[bytes]:
+        """
+        Fetch a minimal forecast, one parameter at one time step, to tell the latest model
+        run from. Returns raw XML bytes or None if failed.
+        """
+        try:
+            params = self._build_forecast_params([place], 0)
+            params["parameters"] = "temperature"
+            response = self.request("GET", "", {"params": params}, useJSON=False)
+
+            return self._validate_response(response)
+
+        except Exception as e:
+            Log.error(f"Unexpected error checking for a new forecast: {e}")
+            return None
+
+    def get_forecast_window(self, future_hours: int) -> Tuple[datetime, datetime]:
+        """First and last time step of a forecast requested now, in FMI API time."""
+        now = datetime.now()
+        # Round down to current hour to include the ongoing hour
+        start_hour = now.replace(minute=0, second=0, microsecond=0)
+        return start_hour, start_hour + timedelta(hours=future_hours)
+
     def _get_optimal_timestep(self, future_hours: int) -> int:
         """Get optimal timestep based on forecast duration."""
         if future_hours <= 15:  # STEP_LIMIT_TINY
@@ -71,12 +133,11 @@ class FMIWeatherAPI(BaseAPI):
         else:
             return 60
 
-    def _build_forecast_params(self, config: SaaConfig, future_hours: int) -> Dict[str, str]:
+    def _build_forecast_params(
+        self, places: List[str], future_hours: int
+    ) -> Dict[str, Union[str, List[str]]]:
         """Build parameters for FMI API request."""
-        now = datetime.now()
-        # Round down to current hour to include the ongoing hour
-        start_hour = now.replace(minute=0, second=0, microsecond=0)
-        future_time = start_hour + timedelta(hours=future_hours)
+        start_hour, future_time = self.get_forecast_window(future_hours)
         timestep = self._get_optimal_timestep(future_hours)
 
         # Format datetime for FMI API (needs Z suffix and no microseconds)
@@ -87,77 +148,115 @@ class FMIWeatherAPI(BaseAPI):
             "request": "getFeature",
             "storedquery_id": FMI_STORED_QUERY_ID,
             "parameters": FMI_WEATHER_PARAMETERS,
-            "place": config.place,
+            # Repeated parameters, one per location
+            "place": [place for place in places if not is_coordinates(place)],
+            "latlon": [place.replace(" ", "") for place in places if is_coordinates(place)],
             "timestep": str(timestep),
             "starttime": start_time,
             "endtime": end_time,
         }
 
-    def _validate_response(self, response) -> Optional[str]:
-        """Validate and return response data."""
+    def _validate_response(self, response) -> Optional[bytes]:
+        """Validate and return the undecoded response body, for the streaming parser."""
         if not response.ok:
             Log.error(f"FMI API request failed with status {response.status}")
             return None
 
-        if not response.data or str(response.data).strip() == "":
+        if not response.raw or not response.raw.strip():
             Log.error("Empty response from FMI API")
             return None
 
-        return str(response.data)
+        return response.raw
+
+
+def get_skyfield_data(ephemeris_path: str) -> Tuple[Timescale, SpiceKernel]:
+    """
+    Get the timescale and the ephemeris at `ephemeris_path`, loaded once per process.
+    A missing ephemeris file is downloaded into its directory.
+    """
+    with _skyfield_lock:
+        if ephemeris_path not in _ephemerides:
+            directory, filename = os.path.split(os.path.abspath(ephemeris_path))
+            loader = Loader(directory, verbose=False)
+            _ephemerides[ephemeris_path] = (loader.timescale(), loader(filename))
+        return _ephemerides[ephemeris_path]
 
 
 class SolarCalculator:
-    """Calculate sunrise/sunset times locally without external API dependencies."""
+    """
+    Calculate sunrise/sunset times locally without external API dependencies, at the
+    given location (Salo by default).
+    """
+
+    def __init__(
+        self,
+        ephemeris_path: str = DEFAULT_EPHEMERIS_PATH,
+        latitude: float = SALO["lat"],
+        longitude: float = SALO["lng"],
+    ):
+        self.ephemeris_path = ephemeris_path
+        self.latitude = latitude
+        self.longitude = longitude
 
     def sunrise_sunset(self, date: datetime) -> Optional[Dict[str, Any]]:
         """
-        Calculate accurate sunrise/sunset times using Skyfield astronomical library for Salo.
+        Calculate accurate sunrise/sunset times using Skyfield astronomical library.
         """
-        try:
-            solar_times = self._calculate_solar_times(date)
-            if not solar_times:
-                Log.warning(f"Could not find sunrise/sunset for Salo on {date}")
-                return None
+        date_key = date.strftime("%Y-%m-%d")
+        result = self.sunrise_sunset_range(date, date).get(date_key)
+        if not result:
+            Log.warning(
+                f"Could not find sunrise/sunset at {self.latitude}, {self.longitude} on {date}"
+            )
+        return result
 
-            return self._format_solar_result(solar_times)
+    def sunrise_sunset_range(self, first: date, last: date) -> Dict[str, Dict[str, Any]]:
+        """
+        Calculate sunrise/sunset times at the location for every day from `first` to `last`.
+        Returns dict keyed by date ("YYYY-MM-DD"), without days lacking a sunrise or sunset.
+        """
+        try:
+            solar_times = self._calculate_solar_times(first, last)
+            return {
+                date_key: self._format_solar_result(times)
+                for date_key, times in solar_times.items()
+            }
 
         except Exception as e:
             Log.error(f"Error calculating sunrise/sunset with Skyfield: {e}")
-            return None
+            return {}
 
-    def _calculate_solar_times(self, date: datetime) -> Optional[Dict[str, str]]:
-        """Calculate sunrise and sunset times for Salo, Finland."""
-        # Load ephemeris data
-        ts = load.timescale()
-        eph = load("de421.bsp")
+    def _calculate_solar_times(self, first: date, last: date) -> Dict[str, Dict[str, str]]:
+        """Calculate sunrise and sunset times at the location in a single search."""
+        ts, eph = get_skyfield_data(self.ephemeris_path)
 
-        # Create location for Salo
-        location = wgs84.latlon(SALO["lat"] * N, SALO["lng"] * E)
+        location = wgs84.latlon(self.latitude * N, self.longitude * E)
 
-        # Define the date range for the calculation
-        t0 = ts.utc(date.year, date.month, date.day)
-        t1 = ts.utc(date.year, date.month, date.day + 1)
+        # Define the date range for the calculation, whole UTC days
+        t0 = ts.utc(first.year, first.month, first.day)
+        t1 = ts.utc(last.year, last.month, last.day + 1)
 
         # Find sunrise and sunset
         f = almanac.sunrise_sunset(eph, location)
         times, events = almanac.find_discrete(t0, t1, f)
 
-        sunrise_time = None
-        sunset_time = None
+        solar_times = defaultdict(dict)
 
-        for time, event in zip(times, events):
+        for utc_time, event in zip(times.utc_datetime(), events):
             # Convert to Finnish time (Europe/Helsinki timezone)
-            local_time = time.astimezone(tz=None)  # Uses system timezone
+            local_time = utc_time.astimezone(tz=None)  # Uses system timezone
+            day = solar_times[utc_time.strftime("%Y-%m-%d")]
 
             if event == 1:  # Sunrise
-                sunrise_time = local_time.strftime("%H:%M")
+                day["sunrise"] = local_time.strftime("%H:%M")
             elif event == 0:  # Sunset
-                sunset_time = local_time.strftime("%H:%M")
-
-        if sunrise_time and sunset_time:
-            return {"sunrise": sunrise_time, "sunset": sunset_time}
+                day["sunset"] = local_time.strftime("%H:%M")
 
-        return None
+        return {
+            date_key: times
+            for date_key, times in solar_times.items()
+            if "sunrise" in times and "sunset" in times
+        }
 
     def _format_solar_result(self, solar_times: Dict[str, str]) -> Dict[str, Any]:
         """Format solar calculation result with day length."""
@@ -1,7 +1,19 @@
+from typing import List
+
 from utils.schema import JSONModel
 
+# JPL ephemeris for the sunrise/sunset calculation, downloaded here if missing
+DEFAULT_EPHEMERIS_PATH = "de421.bsp"
+
 
 class SaaConfig(JSONModel):
     place: str = "salo"
+    # Places to render a page for each, by name or as "lat,lon". Default: just `place`
+    places: List[str] = []
     future_days: int = 1
+    # Hours ahead to also fetch at a finer time step, merged into the forecast. 0 disables
+    nowcast_hours: int = 0
     output_dir: str = "_out/saa"
+    ephemeris_path: str = DEFAULT_EPHEMERIS_PATH
+    # Look sunrise/sunset times up from a table of the whole year, kept in the cache
+    solar_table: bool = True
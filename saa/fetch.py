@@ -1,22 +1,288 @@
-from datetime import datetime
-from typing import Optional, Dict, Any
+import json
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+
+from config import should_ignore_cache
+from utils.cache import cache_output, get_cache_key, get_current_store
+from utils.cassette import is_cassette_active
+from utils.logging import Log
+from utils.tracing import span
 from .config import SaaConfig
-from .api import FMIWeatherAPI, SolarCalculator
+from .api import (
+    FMIWeatherAPI,
+    SolarCalculator,
+    FMI_MAX_LOCATIONS_PER_REQUEST,
+    FMI_MODEL_RUN_INTERVAL,
+    FMI_MODEL_RUN_RECHECK,
+    SALO,
+    is_coordinates,
+    parse_position,
+)
+from .transform import Forecast, merge_forecasts, parse_weather_xml
+
+FORECAST_CACHE_NAMESPACE = "saa_forecast"
+MODEL_RUN_CACHE_NAMESPACE = "saa_model_run"
+
+# Degrees a returned position may differ from requested coordinates, e.g. by rounding
+FMI_POSITION_TOLERANCE = 0.01
 
 
-def fetch_weather_forecast(config: SaaConfig) -> Optional[str]:
+def fetch_weather_forecasts(config: SaaConfig) -> Dict[str, Dict[str, Any]]:
     """
-    Fetch weather forecast from FMI API.
-    Returns raw XML string or None if failed.
+    Fetch weather forecasts for all configured places, parsed. Returns a dict with the
+    forecast, station info and model run by place, without places that failed.
+
+    Forecasts are cached with the forecast model run they come from, and reused from
+    the current hour on until FMI has a newer run. Other places are fetched from FMI API,
+    in as few requests as possible. With `config.nowcast_hours`, the next hours are
+    fetched separately at a finer time step, and merged into the forecasts.
     """
     api = FMIWeatherAPI()
-    return api.fetch_forecast(config)
+    # A place listed twice is fetched, and its page rendered, only once
+    places = list(dict.fromkeys(config.places or [config.place]))
+    future_hours = api.calculate_future_hours(config.future_days)
+
+    # Recorded and replayed builds must reach the upstream API every time.
+    use_cache = not should_ignore_cache() and not is_cassette_active()
+    latest_run = _get_latest_model_run(api, places[0]) if use_cache else None
+
+    results = _get_forecasts(api, places, future_hours, "forecast", latest_run)
+
+    nowcast_hours = min(config.nowcast_hours, future_hours)
+    if nowcast_hours > 0 and results:
+        nowcasts = _get_forecasts(api, list(results), nowcast_hours, "nowcast", latest_run)
+        for place, nowcast in nowcasts.items():
+            merged = merge_forecasts(results[place]["data"], nowcast["data"])
+            results[place] = {**results[place], "data": merged}
+
+    return results
+
+
+def _get_forecasts(
+    api: FMIWeatherAPI, places: List[str], hours: int, kind: str, latest_run: Optional[str]
+) -> Dict[str, Dict[str, Any]]:
+    """Forecasts of the next `hours` by place, from the cache if they're of `latest_run`."""
+    start, end = api.get_forecast_window(hours)
+    timestep = api._get_optimal_timestep(hours)
+
+    results = {}
+    if latest_run:
+        for place in places:
+            cached = _load_forecast(place, kind)
+            if cached and _is_reusable(cached, latest_run, timestep, start, end):
+                results[place] = {**cached, "data": cached["data"].between(start, end)}
+
+        if results:
+            Log.info(f"Reusing {kind}s of model run {latest_run} for {', '.join(results)}")
+
+    missing = [place for place in places if place not in results]
+    for batch, xml_data in _download_forecasts(api, missing, hours):
+        with span("transform"):
+            locations = parse_weather_xml(xml_data)
+
+        for place, location in _match_locations(batch, locations):
+            results[place] = location
+            if len(location["data"]) and location["model_run"]:
+                _store_forecast(place, kind, location, timestep)
+                _store_latest_model_run(location["model_run"])
+
+    return {place: results[place] for place in places if place in results}
+
+
+def _match_locations(
+    places: List[str], locations: List[Dict[str, Any]]
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Pair requested places with the locations parsed from their response, which come in
+    request order. If some are missing, the rest are paired by station name or position.
+    """
+    if len(locations) == len(places):
+        return list(zip(places, locations))
+
+    Log.warning(f"Expected {len(places)} locations in weather data, got {len(locations)}")
+    matches = []
+    unmatched = list(range(len(locations)))
+    for place in places:
+        index = next((i for i in unmatched if _is_location_of(place, locations[i])), None)
+        if index is None:
+            Log.error(f"No weather data for {place}")
+            continue
+
+        unmatched.remove(index)
+        matches.append((place, locations[index]))
+    return matches
+
+
+def _is_location_of(place: str, location: Dict[str, Any]) -> bool:
+    """Check whether a parsed location is the one requested for a place."""
+    station_info = location["station_info"]
+    if not station_info:
+        return False
+
+    if not is_coordinates(place):
+        return (station_info["name"] or "").casefold() == place.strip().casefold()
+
+    position = parse_position(station_info["position"])
+    requested = tuple(float(part) for part in place.split(","))
+    return position is not None and all(
+        abs(a - b) < FMI_POSITION_TOLERANCE for a, b in zip(position, requested)
+    )
+
+
+def _download_forecasts(
+    api: FMIWeatherAPI, places: List[str], hours: int
+) -> List[Tuple[List[str], bytes]]:
+    """Fetch forecasts in batches. Returns the places of each successful request, with its XML."""
+    # Names and coordinates go in separate requests, so locations come back in order
+    batches = []
+    for kind in (False, True):
+        same_kind = [place for place in places if is_coordinates(place) == kind]
+        for start in range(0, len(same_kind), FMI_MAX_LOCATIONS_PER_REQUEST):
+            batches.append(same_kind[start : start + FMI_MAX_LOCATIONS_PER_REQUEST])
+
+    results = []
+    for batch in batches:
+        xml_data = api.fetch_forecast(batch, hours)
+        if xml_data:
+            results.append((batch, xml_data))
+    return results
 
 
-def fetch_sunrise_sunset(date: datetime) -> Optional[Dict[str, Any]]:
+def _get_latest_model_run(api: FMIWeatherAPI, place: str) -> Optional[str]:
     """
-    Calculate sunrise/sunset times for Salo using local algorithm.
-    Returns dict with sunrise/sunset times or None if failed.
+    Origin time of the latest model run known to be available. Checks FMI API for a newer
+    one only once it is due, with a minimal request. None if no forecast is cached.
     """
-    calculator = SolarCalculator()
-    return calculator.sunrise_sunset(date)
+    state = _load_entry(MODEL_RUN_CACHE_NAMESPACE, "latest")[0]
+    if not state:
+        return None
+
+    now = time.time()
+    next_run_at = _parse_model_run(state["model_run"]) + FMI_MODEL_RUN_INTERVAL.total_seconds()
+    if now < next_run_at or now - state["checked_at"] < FMI_MODEL_RUN_RECHECK.total_seconds():
+        return state["model_run"]
+
+    xml_data = api.fetch_probe(place)
+    locations = parse_weather_xml(xml_data) if xml_data else []
+    model_run = locations[0]["model_run"] if locations else None
+    if not model_run:
+        # Keep using the cached forecasts, and check again on the next build
+        return state["model_run"]
+
+    if model_run != state["model_run"]:
+        Log.info(f"New forecast model run available: {model_run}")
+    _store_latest_model_run(model_run)
+    return model_run
+
+
+def _store_latest_model_run(model_run: str):
+    state = _load_entry(MODEL_RUN_CACHE_NAMESPACE, "latest")[0]
+    if state and _parse_model_run(state["model_run"]) > _parse_model_run(model_run):
+        return
+
+    state = {"model_run": model_run, "checked_at": time.time()}
+    _store_entry(MODEL_RUN_CACHE_NAMESPACE, "latest", state)
+
+
+def _is_reusable(
+    cached: Dict[str, Any], latest_run: Optional[str], timestep: int, start: datetime, end: datetime
+) -> bool:
+    """Whether a cached forecast is of the latest model run, and covers the requested hours."""
+    forecast = cached["data"]
+    return bool(
+        latest_run
+        and cached["model_run"] == latest_run
+        and cached["timestep"] == timestep
+        and len(forecast)
+        and forecast.times[0] <= np.datetime64(start, "s")
+        and forecast.times[-1] >= np.datetime64(end, "s")
+    )
+
+
+def _load_forecast(place: str, kind: str) -> Optional[Dict[str, Any]]:
+    meta, body = _load_entry(FORECAST_CACHE_NAMESPACE, [place, kind])
+    if not meta:
+        return None
+
+    try:
+        return {**meta, "data": Forecast.from_bytes(body)}
+    except (KeyError, ValueError, OSError) as e:
+        Log.warning(f"Ignoring invalid cached forecast for {place}: {e}")
+        return None
+
+
+def _store_forecast(place: str, kind: str, location: Dict[str, Any], timestep: int):
+    meta = {
+        "station_info": location["station_info"],
+        "model_run": location["model_run"],
+        "timestep": timestep,
+    }
+    _store_entry(FORECAST_CACHE_NAMESPACE, [place, kind], meta, location["data"].to_bytes())
+
+
+def _load_entry(namespace: str, key_source: Any) -> Tuple[Optional[Dict[str, Any]], bytes]:
+    """Entries are a line of JSON metadata, followed by an optional binary body."""
+    cache_key = get_cache_key(namespace, key_source)
+    entry = get_current_store().get(cache_key)
+    if not entry:
+        return None, b""
+
+    meta, _, body = entry.data.partition(b"\n")
+    try:
+        return json.loads(meta), body
+    except ValueError as e:
+        Log.warning(f"Ignoring invalid cache entry {cache_key}: {e}")
+        return None, b""
+
+
+def _store_entry(namespace: str, key_source: Any, meta: Dict[str, Any], body: bytes = b""):
+    cache_key = get_cache_key(namespace, key_source)
+    get_current_store().put(cache_key, namespace, json.dumps(meta).encode("utf-8") + b"\n" + body)
+
+
+def _parse_model_run(model_run: str) -> float:
+    return datetime.fromisoformat(model_run.replace("Z", "+00:00")).timestamp()
+
+
+def fetch_sunrise_sunset_range(
+    first: date,
+    last: date,
+    config: SaaConfig,
+    latitude: float = SALO["lat"],
+    longitude: float = SALO["lng"],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Sunrise/sunset times at a location (Salo by default) for every day from `first` to
+    `last`, keyed by date. With `config.solar_table`, they are looked up from yearly
+    tables kept in the cache, unless the cache is bypassed and a whole year would be
+    recalculated on every run.
+    """
+    if not config.solar_table or should_ignore_cache() or is_cassette_active():
+        calculator = SolarCalculator(config.ephemeris_path, latitude, longitude)
+        return calculator.sunrise_sunset_range(first, last)
+
+    solar_data = {}
+    for year in range(first.year, last.year + 1):
+        solar_data.update(_fetch_solar_table(year, config.ephemeris_path, latitude, longitude))
+
+    return {
+        date_key: times
+        for date_key, times in solar_data.items()
+        if first.isoformat() <= date_key <= last.isoformat()
+    }
+
+
+# The table only depends on its arguments, the location included in its cache key;
+# the TTL keeps it clear of cache pruning.
+@cache_output("saa_solar", dict, ttl=timedelta(days=7))
+def _fetch_solar_table(
+    year: int, ephemeris_path: str, latitude: float, longitude: float
+) -> Dict[str, Dict[str, Any]]:
+    calculator = SolarCalculator(ephemeris_path, latitude, longitude)
+    table = calculator.sunrise_sunset_range(date(year, 1, 1), date(year, 12, 31))
+    if not table:
+        raise ValueError(f"No sunrise/sunset times for {year}")
+    return table
@@ -1,50 +1,53 @@
+import re
 from datetime import datetime
+from typing import List
 from config import register_runner
 from utils.logging import Log
 from utils.renderers import render_html, save_file
+from utils.tracing import span
+from .api import SALO, parse_position
 from .config import SaaConfig
-from .fetch import fetch_weather_forecast, fetch_sunrise_sunset
+from .fetch import fetch_weather_forecasts, fetch_sunrise_sunset_range
 from .transform import (
-    parse_weather_xml,
     group_forecast_by_day,
     add_solar_data_to_forecast,
     prepare_weather_context,
 )
 
+# Minutes past each hour at which the page reloads itself in the browser.
+AUTO_REFRESH_MINUTES = [5, 25, 45]
 
-@register_runner("saa", SaaConfig, "Generate weather forecast page for Salo")
+
+@register_runner("saa", SaaConfig, refresh_minutes=AUTO_REFRESH_MINUTES)
 def run_saa(config: SaaConfig):
     """
     Run the weather forecast ETL pipeline.
-    Fetches FMI weather data, transforms it, and renders to HTML.
+    Fetches FMI weather data, transforms it, and renders to HTML, one page per place.
     """
-    Log.info(f"Starting weather forecast generation for {config.place}")
+    places = config.places or [config.place]
+    Log.info(f"Starting weather forecast generation for {', '.join(places)}")
 
-    # Fetch weather data from FMI API
-    xml_data = fetch_weather_forecast(config)
-    if not xml_data:
+    # Fetch weather data from FMI API, or reuse it while no newer forecast is available
+    with span("fetch"):
+        weather_results = fetch_weather_forecasts(config)
+    if not weather_results:
         Log.error("Failed to fetch weather data - aborting")
         return
 
-    # Transform XML data to structured format
-    weather_result = parse_weather_xml(xml_data)
-    forecast_data = weather_result["data"]
-    station_info = weather_result["station_info"]
-
-    if not forecast_data:
-        Log.error("No forecast data available - aborting")
-        return
-
-    Log.info(f"Processing {len(forecast_data)} forecast points")
-
     # Group forecast data by day
-    daily_forecasts = group_forecast_by_day(forecast_data)
+    daily_forecasts_by_place = {}
+    with span("transform"):
+        for place, weather_result in weather_results.items():
+            if not len(weather_result["data"]):
+                Log.error(f"No forecast data available for {place} - skipping")
+                continue
 
-    # Fetch sunrise/sunset data for each day
-    sunrise_sunset_data = _fetch_solar_data_for_days(daily_forecasts)
+            Log.info(f"Processing {len(weather_result['data'])} forecast points for {place}")
+            daily_forecasts_by_place[place] = group_forecast_by_day(weather_result["data"])
 
-    # Add solar data to daily forecasts
-    daily_forecasts = add_solar_data_to_forecast(daily_forecasts, sunrise_sunset_data)
+    if not daily_forecasts_by_place:
+        Log.error("No forecast data available - aborting")
+        return
 
     # Calculate future hours for context
     from .api import FMIWeatherAPI
@@ -52,40 +55,67 @@ def run_saa(config: SaaConfig):
     api = FMIWeatherAPI()
     future_hours = api.calculate_future_hours(config.future_days)
 
-    # Prepare and render template
-    context = prepare_weather_context(future_hours, forecast_data, daily_forecasts, station_info)
-    _render_weather_template(context, config)
+    for place, daily_forecasts in daily_forecasts_by_place.items():
+        station_info = weather_results[place]["station_info"]
 
-    Log.info(f"Weather forecast generated successfully at {config.output_dir}/index.html")
-    Log.info(
-        f"Forecast covers {len(forecast_data)} time points over {future_hours} hours ({config.future_days} days)"
-    )
+        # Fetch sunrise/sunset data at the place's forecast location
+        with span("fetch", source="solar"):
+            sunrise_sunset_data = _fetch_solar_data_for_days(daily_forecasts, config, station_info)
 
+        # Add solar data to daily forecasts
+        with span("transform"):
+            daily_forecasts = add_solar_data_to_forecast(daily_forecasts, sunrise_sunset_data)
 
-def _fetch_solar_data_for_days(daily_forecasts):
-    """Fetch sunrise/sunset data for all forecast days."""
+        # Prepare and render template
+        context = prepare_weather_context(
+            future_hours, daily_forecasts, station_info, requested_location=place.title()
+        )
+        output_paths = _get_output_paths(config, place)
+        _render_weather_template(context, output_paths)
+
+        Log.info(f"Weather forecast generated successfully at {', '.join(output_paths)}")
+        Log.info(
+            f"Forecast covers {len(weather_results[place]['data'])} time points over {future_hours} hours ({config.future_days} days)"
+        )
+
+
+def _fetch_solar_data_for_days(daily_forecasts, config: SaaConfig, station_info):
+    """Fetch sunrise/sunset data for all forecast days, at the station (Salo if unknown)."""
     if not daily_forecasts:
         return {}
 
-    sunrise_sunset_data = {}
+    position = parse_position(station_info["position"]) if station_info else None
+    if not position:
+        Log.warning("No position for the forecast location, using Salo's sunrise/sunset")
+        position = (SALO["lat"], SALO["lng"])
+
+    try:
+        dates = [datetime.strptime(day["date"], "%Y-%m-%d").date() for day in daily_forecasts]
+        return fetch_sunrise_sunset_range(min(dates), max(dates), config, *position)
+    except Exception as e:
+        Log.warning(f"Failed to get sunrise/sunset for the forecast days: {e}")
+        return {}
+
 
-    for day_forecast in daily_forecasts:
-        date_str = day_forecast["date"]
-        try:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-            solar_data = fetch_sunrise_sunset(date_obj)
-            if solar_data:
-                sunrise_sunset_data[date_str] = solar_data
-        except Exception as e:
-            Log.warning(f"Failed to get sunrise/sunset for {date_str}: {e}")
+def _get_output_paths(config: SaaConfig, place: str) -> List[str]:
+    """
+    Pages go to the output directory, or its subdirectory by place with several places.
+    The first place's page then stays at the output directory too, for existing links.
+    """
+    places = list(dict.fromkeys(config.places))
+    index_path = f"{config.output_dir}/index.html"
+    if len(places) <= 1:
+        return [index_path]
 
-    return sunrise_sunset_data
+    slug = re.sub(r"\W+", "-", place.lower()).strip("-")
+    place_path = f"{config.output_dir}/{slug}/index.html"
+    return [place_path, index_path] if place == places[0] else [place_path]
 
 
-def _render_weather_template(context, config):
-    """Render and save the weather template."""
+def _render_weather_template(context, output_paths: List[str]):
+    """Render the weather template and save it to each of the given paths."""
     template_path = "saa/template.html"
-    output_path = f"{config.output_dir}/index.html"
 
-    html_content = render_html(context, template_path, auto_refresh_minutes=[5, 25, 45])
-    save_file(output_path, html_content)
+    html_content = render_html(context, template_path, auto_refresh_minutes=AUTO_REFRESH_MINUTES)
+    for output_path in output_paths:
+        save_file(output_path, html_content)
@@ -1,60 +1,164 @@
-import xml.etree.ElementTree as ET
+import io
+from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import Dict, Any, Optional, List
-from collections import defaultdict
+from typing import BinaryIO, Dict, Any, Optional, List, Tuple, Union
+
+import numpy as np
+
 from utils.logging import Log
 
+try:
+    from lxml import etree as ET
+except ImportError:  # Optional, faster parser; the standard library one is always available
+    import xml.etree.ElementTree as ET
+
+# Forecast columns by the FMI parameter they are read from
+PARAMETER_COLUMNS = (
+    ("temperature", "temperature"),
+    ("Precipitation1h", "precipitation"),
+    ("PoP", "precipitation_probability"),
+    ("WindSpeedMS", "wind_speed"),
+    ("WindDirection", "wind_direction"),
+    ("Humidity", "humidity"),
+    ("TotalCloudCover", "cloud_cover"),
+)
+
+
+@dataclass
+class Forecast:
+    """
+    Weather forecast as parallel arrays, one element per time step in time order.
+    Missing values are NaN. Slicing a forecast gives views of the same arrays.
+    """
 
-def get_temperature_color(temp: Optional[float]) -> str:
+    times: np.ndarray  # datetime64[s], UTC
+    temperature: np.ndarray
+    precipitation: np.ndarray  # mm/h
+    precipitation_probability: np.ndarray  # %
+    wind_speed: np.ndarray  # m/s
+    wind_direction: np.ndarray  # Degrees
+    humidity: np.ndarray  # %
+    cloud_cover: np.ndarray  # Whole %
+    temperature_color: np.ndarray  # CSS colors
+    weather_icon: np.ndarray  # Emojis
+
+    @classmethod
+    def empty(cls) -> "Forecast":
+        return cls(
+            times=np.array([], dtype="datetime64[s]"),
+            **{f.name: np.array([]) for f in fields(cls) if f.name != "times"},
+        )
+
+    @classmethod
+    def from_columns(cls, times: np.ndarray, columns: Dict[str, np.ndarray]) -> "Forecast":
+        """Forecast of the given parameter columns, with the calculated fields added."""
+        return cls(
+            times=times,
+            **columns,
+            temperature_color=get_temperature_colors(columns["temperature"]),
+            weather_icon=get_weather_icons(columns["cloud_cover"], columns["precipitation"]),
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Forecast":
+        """Load a forecast serialized with `to_bytes()`."""
+        with np.load(io.BytesIO(data)) as arrays:
+            columns = {name: arrays[name] for _, name in PARAMETER_COLUMNS}
+            return cls.from_columns(arrays["times"].astype("datetime64[s]"), columns)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the times and parameter columns, in NumPy's npz format."""
+        buffer = io.BytesIO()
+        columns = {name: getattr(self, name) for _, name in PARAMETER_COLUMNS}
+        np.savez(buffer, times=self.times.astype("int64"), **columns)
+        return buffer.getvalue()
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __getitem__(self, index: slice) -> "Forecast":
+        return Forecast(**{f.name: getattr(self, f.name)[index] for f in fields(self)})
+
+    def between(self, start: datetime, end: datetime) -> "Forecast":
+        """Time steps from `start` to `end`, inclusive. Naive datetimes count as UTC."""
+        first = np.searchsorted(self.times, np.datetime64(start, "s"), side="left")
+        last = np.searchsorted(self.times, np.datetime64(end, "s"), side="right")
+        return self[first:last]
+
+    def to_points(self) -> List[Dict[str, Any]]:
+        """One dict per time step, with None for missing values, for templates."""
+        raw_times = [f"{time}Z" for time in np.datetime_as_string(self.times, unit="s")]
+        columns = {
+            name: [None if value != value else value for value in getattr(self, name).tolist()]
+            for _, name in PARAMETER_COLUMNS
+        }
+        columns["cloud_cover"] = [None if c is None else int(c) for c in columns["cloud_cover"]]
+
+        return [
+            {
+                "time": format_time(raw_time),
+                "raw_time": raw_time,
+                **{name: values[index] for name, values in columns.items()},
+                "temperature_color": self.temperature_color[index],
+                "weather_icon": self.weather_icon[index],
+            }
+            for index, raw_time in enumerate(raw_times)
+        ]
+
+
+def get_temperature_colors(temperatures: np.ndarray) -> np.ndarray:
     """
-    Calculate temperature color using HSL for clean hue shifting.
+    Calculate temperature colors using HSL for clean hue shifting.
     Range: -20°C (blue 240°) -> 0°C (cyan 180°) -> 20°C (green 120°) -> 30°C (yellow 60°) -> 35°C (red 0°).
-    Returns CSS HSL color string with good contrast.
+    Returns CSS HSL color strings with good contrast.
     """
-    if temp is None:
-        return "#666666"  # Gray for missing data
-
     # Clamp temperature to range and map to hue
-    temp = max(-20, min(35, temp))
+    temps = np.clip(temperatures, -20, 35)
 
     # Map temperature to hue (240° to 0°)
     # -20°C = 240° (blue), 0°C = 200° (light blue), 20°C = 120° (green), 35°C = 0° (red)
-    if temp <= 0:
-        # -20°C to 0°C: blue (240°) to light blue/cyan (200°)
-        hue = 240 - ((temp + 20) / 20) * 40  # 240 to 200
-    elif temp <= 20:
-        # 0°C to 20°C: cyan (200°) to green (120°)
-        hue = 200 - (temp / 20) * 80  # 200 to 120
-    else:
-        # 20°C to 35°C: green (120°) to red (0°)
-        hue = 120 - ((temp - 20) / 15) * 120  # 120 to 0
+    hues = np.select(
+        [temps <= 0, temps <= 20],
+        [
+            240 - ((temps + 20) / 20) * 40,  # -20°C to 0°C: blue to light blue/cyan
+            200 - (temps / 20) * 80,  # 0°C to 20°C: cyan to green
+        ],
+        120 - ((temps - 20) / 15) * 120,  # 20°C to 35°C: green to red
+    )
 
     # Use high saturation and theme-aware lightness via CSS variables
     saturation = 65  # High saturation for vibrant colors
 
-    return f"hsl({hue:.0f}, {saturation}%, var(--temp-lightness, 45%))"
+    colors = np.array(
+        [f"hsl({hue:.0f}, {saturation}%, var(--temp-lightness, 45%))" for hue in hues.tolist()],
+        dtype=object,
+    )
+    colors[np.isnan(temperatures)] = "#666666"  # Gray for missing data
+    return colors
 
 
-def get_weather_icon(cloud_cover: Optional[int], precipitation: Optional[float]) -> str:
+def get_weather_icons(cloud_cover: np.ndarray, precipitation: np.ndarray) -> np.ndarray:
     """
-    Get weather icon based on cloud cover and precipitation.
-    Returns Unicode weather emoji.
+    Get weather icons based on cloud cover and precipitation.
+    Returns Unicode weather emojis.
     """
-    if precipitation is not None and precipitation > 0.1:
-        if precipitation > 2.0:
-            return "🌧️"  # Heavy rain
-        else:
-            return "🌦️"  # Light rain
-
-    if cloud_cover is not None:
-        if cloud_cover > 75:
-            return "☁️"  # Cloudy
-        elif cloud_cover > 25:
-            return "⛅"  # Partly cloudy
-        else:
-            return "☀️"  # Sunny
-
-    return "🌤️"  # Default partly sunny
+    return np.select(
+        [
+            precipitation > 2.0,
+            precipitation > 0.1,
+            cloud_cover > 75,
+            cloud_cover > 25,
+            ~np.isnan(cloud_cover),
+        ],
+        [
+            "🌧️",  # Heavy rain
+            "🌦️",  # Light rain
+            "☁️",  # Cloudy
+            "⛅",  # Partly cloudy
+            "☀️",  # Sunny
+        ],
+        "🌤️",  # Default partly sunny
+    ).astype(object)
 
 
 def format_time(date_str: str | None) -> str:
@@ -79,221 +183,153 @@ def format_time(date_str: str | None) -> str:
         return date_str
 
 
-def parse_weather_xml(xml_string: str) -> Dict[str, Any]:
+def parse_weather_xml(xml_data: Union[bytes, str]) -> List[Dict[str, Any]]:
     """
     Parse weather XML from FMI API and extract structured data.
-    Returns dict with weather data and station info.
+    Returns a dict with the forecast, station info and the origin time of the forecast
+    model run for each location in the response, in response order.
     """
-    if not xml_string or not xml_string.strip():
+    if not xml_data or not xml_data.strip():
         Log.error("Empty XML string provided")
-        return {"data": [], "station_info": None}
-
-    try:
-        root = ET.fromstring(xml_string)
-        namespaces = _get_xml_namespaces()
-
-        # Extract station information
-        station_info = extract_station_info(root, namespaces)
-
-        # Parse raw observations from XML
-        raw_observations = _extract_observations(root, namespaces)
-
-        # Group and process the data
-        weather_data = _process_weather_observations(raw_observations)
+        return []
 
-        # Enrich with calculated fields
-        enriched_data = _enrich_weather_data(weather_data)
+    if isinstance(xml_data, str):
+        xml_data = xml_data.encode("utf-8")
 
-        Log.info(f"Parsed {len(enriched_data)} weather forecast points")
-        return {"data": enriched_data, "station_info": station_info}
+    try:
+        # Parse raw observations and station info of each location from XML
+        locations, model_run = _parse_forecast(io.BytesIO(xml_data))
+
+        results = []
+        for series, station_info in locations:
+            # Align the series into columns, with calculated fields
+            forecast = _build_forecast(series)
+            results.append({"data": forecast, "station_info": station_info, "model_run": model_run})
+
+        Log.info(
+            f"Parsed {sum(len(result['data']) for result in results)} weather forecast points"
+            f" for {len(results)} locations"
+        )
+        return results
 
     except ET.ParseError as e:
         Log.error(f"XML parsing failed: {e}")
-        return {"data": [], "station_info": None}
+        return []
     except Exception as e:
         Log.error(f"Unexpected error parsing weather XML: {e}")
-        return {"data": [], "station_info": None}
-
-
-def extract_station_info(
-    root: ET.Element, namespaces: Dict[str, str]
-) -> Optional[Dict[str, str | None]]:
-    """Extract station information from XML root."""
-    try:
-        # Look for station name and info in various places
-        station_name = None
-        station_id = None
-        position = None
-
-        # Try to find name elements
-        for elem in root.iter():
-            if elem.tag.lower().endswith("name") and elem.text:
-                if len(elem.text) > 2 and len(elem.text) < 100:
-                    station_name = elem.text
-                    break
-
-        # Try to find identifier
-        for elem in root.iter():
-            if "identifier" in elem.tag.lower() and elem.text:
-                station_id = elem.text
-                break
-
-        # Try to find position
-        pos_elements = root.findall(".//gml:pos", namespaces)
-        if pos_elements:
-            position = pos_elements[0].text
-
-        if station_name or station_id:
-            return {"name": station_name, "id": station_id, "position": position}
-
-        return None
-
-    except Exception as e:
-        Log.warning(f"Failed to extract station info: {e}")
-        return None
+        return []
 
 
-def group_forecast_by_day(forecast_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def group_forecast_by_day(forecast: Forecast) -> List[Dict[str, Any]]:
     """
-    Group forecast data by day and add date metadata.
-    Returns list of daily forecast objects.
+    Group forecast data by (UTC) day and add date metadata.
+    Returns list of daily forecast objects, each with a slice of the forecast.
     """
-    if not forecast_data:
+    if not len(forecast):
         return []
 
-    forecast_by_day = defaultdict(list)
-    unique_dates = set()
-
-    for point in forecast_data:
-        try:
-            # Parse the raw time to get the date
-            dt = datetime.fromisoformat(point["raw_time"].replace("Z", "+00:00"))
-            date_key = dt.strftime("%Y-%m-%d")
-            day_name = dt.strftime("%A")
-            date_display = dt.strftime("%d.%m.")
-
-            point["date_key"] = date_key
-            point["day_name"] = day_name
-            point["date_display"] = date_display
-
-            forecast_by_day[date_key].append(point)
-            unique_dates.add(date_key)
-        except Exception as e:
-            Log.warning(f"Failed to parse date for point: {e}")
-            continue
-
-    # Sort days chronologically
-    sorted_days = sorted(unique_dates)
+    # Times are sorted, so each day is a contiguous run
+    days, starts = np.unique(forecast.times.astype("datetime64[D]"), return_index=True)
+    stops = [*starts[1:].tolist(), len(forecast)]
 
-    # Organize forecast by day
     daily_forecasts = []
-    for date_key in sorted_days:
-        day_points = forecast_by_day[date_key]
-        if day_points:
-            daily_forecasts.append(
-                {
-                    "date": date_key,
-                    "day_name": day_points[0]["day_name"],
-                    "date_display": day_points[0]["date_display"],
-                    "points": day_points,
-                }
-            )
+    for day, start, stop in zip(days.tolist(), starts.tolist(), stops):
+        daily_forecasts.append(
+            {
+                "date": day.strftime("%Y-%m-%d"),
+                "day_name": day.strftime("%A"),
+                "date_display": day.strftime("%d.%m."),
+                "forecast": forecast[start:stop],
+            }
+        )
 
     return daily_forecasts
 
 
-def analyze_weather_warnings(day_points: List[Dict[str, Any]]) -> List[str]:
+def merge_forecasts(forecast: Forecast, nowcast: Forecast) -> Forecast:
+    """Forecast with the time steps of `nowcast` in place of its own, where they overlap."""
+    if not len(nowcast):
+        return forecast
+
+    first = np.searchsorted(forecast.times, nowcast.times[0], side="left")
+    last = np.searchsorted(forecast.times, nowcast.times[-1], side="right")
+    return Forecast(
+        **{
+            f.name: np.concatenate(
+                [
+                    getattr(forecast, f.name)[:first],
+                    getattr(nowcast, f.name),
+                    getattr(forecast, f.name)[last:],
+                ]
+            )
+            for f in fields(Forecast)
+        }
+    )
+
+
+def analyze_weather_warnings(day: Forecast) -> List[str]:
     """
     Analyze daily weather points and generate human-readable warnings/summaries.
     Returns list of warning strings with emojis.
     """
-    if not day_points:
+    if not len(day):
         return []
 
     warnings = []
 
     # Analyze precipitation
-    rain_points = [p for p in day_points if p.get("precipitation") and p["precipitation"] > 0.0]
-    moderate_rain_points = [
-        p for p in day_points if p.get("precipitation") and p["precipitation"] > 0.5
-    ]
-    heavy_rain_points = [
-        p for p in day_points if p.get("precipitation") and p["precipitation"] >= 1.5
-    ]
-    torrential_rain_points = [
-        p for p in day_points if p.get("precipitation") and p["precipitation"] >= 4
-    ]
-
-    high_rain_prob_points = [
-        p
-        for p in day_points
-        if p.get("precipitation_probability") and p["precipitation_probability"] > 30
-    ]
-
-    if len(torrential_rain_points) >= 1:
+    precipitation = day.precipitation
+    rain_count = np.count_nonzero(precipitation > 0.0)
+    high_rain_prob_count = np.count_nonzero(day.precipitation_probability > 30)
+
+    if np.count_nonzero(precipitation >= 4) >= 1:
         warnings.append("Kovaa sadetta ☔")
-    elif len(heavy_rain_points) >= 2:
+    elif np.count_nonzero(precipitation >= 1.5) >= 2:
         warnings.append("Sataa ☔")
-    elif len(moderate_rain_points) >= 1:
+    elif np.count_nonzero(precipitation > 0.5) >= 1:
         warnings.append("Ajoittaista sadetta 🌧️")
-    elif len(rain_points) >= 1 or len(high_rain_prob_points) >= 1:
+    elif rain_count >= 1 or high_rain_prob_count >= 1:
         warnings.append("Tihkua 🌧️")
 
     # Analyze sunshine/clouds
-    sunny_points = [
-        p for p in day_points if p.get("cloud_cover") is not None and p["cloud_cover"] < 25
-    ]
-    mostly_sunny_points = [
-        p for p in day_points if p.get("cloud_cover") is not None and p["cloud_cover"] < 50
-    ]
-    cloudy_points = [
-        p for p in day_points if p.get("cloud_cover") is not None and p["cloud_cover"] > 75
-    ]
-
-    total_points = len([p for p in day_points if p.get("cloud_cover") is not None])
+    cloud_cover = day.cloud_cover
+    total_points = np.count_nonzero(~np.isnan(cloud_cover))
 
     if total_points > 0:
-        if len(sunny_points) == total_points and not rain_points:
+        if np.count_nonzero(cloud_cover < 25) == total_points and not rain_count:
             warnings.append("Aurinkoinen päivä ☀️")
-        elif len(mostly_sunny_points) >= total_points * 0.75 and not rain_points:
+        elif np.count_nonzero(cloud_cover < 50) >= total_points * 0.75 and not rain_count:
             warnings.append("Pääosin aurinkoista 🌤️")
-        elif len(cloudy_points) >= total_points * 0.75:
+        elif np.count_nonzero(cloud_cover > 75) >= total_points * 0.75:
             warnings.append("Pilvinen päivä ☁️")
 
     # Analyze wind using Finnish meteorological classification
-    hurricane_points = [p for p in day_points if p.get("wind_speed") and p["wind_speed"] >= 33]
-    storm_points = [p for p in day_points if p.get("wind_speed") and p["wind_speed"] >= 21]
-    strong_wind_points = [p for p in day_points if p.get("wind_speed") and p["wind_speed"] >= 14]
-    brisk_wind_points = [p for p in day_points if p.get("wind_speed") and p["wind_speed"] >= 8]
-    moderate_wind_points = [p for p in day_points if p.get("wind_speed") and p["wind_speed"] >= 4]
+    wind_speed = day.wind_speed
 
-    if hurricane_points:
+    if np.count_nonzero(wind_speed >= 33):
         warnings.append("Hirmumyrskyä 🌪️")
-    elif storm_points:
+    elif np.count_nonzero(wind_speed >= 21):
         warnings.append("Myrskytuulia 🌪️")
-    elif len(strong_wind_points) >= 2:
+    elif np.count_nonzero(wind_speed >= 14) >= 2:
         warnings.append("Kovaa tuulta 🌬️")
-    elif len(brisk_wind_points) >= 3:
+    elif np.count_nonzero(wind_speed >= 8) >= 3:
         warnings.append("Navakkaa tuulta 💨")
-    elif len(moderate_wind_points) >= 4:
+    elif np.count_nonzero(wind_speed >= 4) >= 4:
         warnings.append("Kohtalaista tuulta 🍃")
 
     # Analyze humidity
-    humid_points = [p for p in day_points if p.get("humidity") and p["humidity"] > 80]
-    total_humidity_points = len([p for p in day_points if p.get("humidity") is not None])
+    humid_count = np.count_nonzero(day.humidity > 80)
+    total_humidity_points = np.count_nonzero(~np.isnan(day.humidity))
 
-    if total_humidity_points > 0 and len(humid_points) >= total_humidity_points * 0.75:
+    if total_humidity_points > 0 and humid_count >= total_humidity_points * 0.75:
         warnings.append("Kostea ilma 💧")
 
     # Analyze temperature
-    temperatures = [p["temperature"] for p in day_points if p.get("temperature") is not None]
-    if temperatures:
-        max_temp = max(temperatures)
-        min_temp = min(temperatures)
-
-        if max_temp > 25:
+    temperatures = day.temperature[~np.isnan(day.temperature)]
+    if len(temperatures):
+        if temperatures.max() > 25:
             warnings.append("Kuuma päivä 🌡️")
-        elif min_temp < 0:
+        elif temperatures.min() < 0:
             warnings.append("Pakkasta ❄️")
 
     return warnings
@@ -320,29 +356,35 @@ def add_solar_data_to_forecast(
         )
 
         # Add weather warnings
-        day_forecast["weather_warnings"] = analyze_weather_warnings(day_forecast["points"])
+        day_forecast["weather_warnings"] = analyze_weather_warnings(day_forecast["forecast"])
 
     return daily_forecasts
 
 
 def prepare_weather_context(
     future_hours: int,
-    forecast_data: List[Dict[str, Any]],
     daily_forecasts: List[Dict[str, Any]],
     station_info: Optional[Dict[str, Any]],
+    requested_location: str = "Salo",
 ) -> Dict[str, Any]:
     """
     Prepare template context for weather forecast rendering.
+    Daily forecasts get their points as dicts here, for the template.
     """
-    title = "Säätiedot - Salo"
+    title = f"Säätiedot - {requested_location}"
     if station_info and station_info.get("name"):
         title = f"Säätiedot - {station_info['name']}"
 
     return {
         "title": title,
-        "requested_location": "Salo",
-        "forecast_data": forecast_data,  # Keep original for compatibility
-        "daily_forecasts": daily_forecasts,  # New organized data
+        "requested_location": requested_location,
+        "daily_forecasts": [
+            {
+                **{key: value for key, value in day.items() if key != "forecast"},
+                "points": day["forecast"].to_points(),
+            }
+            for day in daily_forecasts
+        ],
         "station_info": station_info,
         "updated_timestamp": datetime.now().strftime("%d.%m.%Y klo %H:%M"),
         "forecast_hours": future_hours,
@@ -362,169 +404,182 @@ def _get_xml_namespaces() -> Dict[str, str]:
     }
 
 
-def _extract_observations(
-    root: ET.Element, namespaces: Dict[str, str]
-) -> Dict[str, Dict[str, Any]]:
-    """Extract raw weather observations from XML into time-indexed dict."""
-    data_by_time = {}
-    observations = root.findall(".//omso:PointTimeSeriesObservation", namespaces)
+def _tag(prefix: str, name: str) -> str:
+    """Qualified element name, as reported by the parser."""
+    return f"{{{_get_xml_namespaces()[prefix]}}}{name}"
 
-    if not observations:
-        return data_by_time
 
-    for obs in observations:
-        # Get the observed property to determine data type
-        observed_property = obs.find(".//om:observedProperty", namespaces)
-        if observed_property is None:
+_OBSERVATION = _tag("omso", "PointTimeSeriesObservation")
+_OBSERVED_PROPERTY = _tag("om", "observedProperty")
+_POINT = _tag("wml2", "point")
+_TIME = _tag("wml2", "time")
+_VALUE = _tag("wml2", "value")
+_POSITION = _tag("gml", "pos")
+_RESULT_TIME = _tag("om", "resultTime")
+_TIME_POSITION = _tag("gml", "timePosition")
+_HREF = _tag("xlink", "href")
+
+# Time series of one parameter: times and values, as read from the XML
+Series = Tuple[List[str], List[Optional[str]]]
+
+
+def _parse_forecast(
+    source: BinaryIO,
+) -> Tuple[List[Tuple[Dict[str, Series], Optional[Dict[str, str | None]]]], Optional[str]]:
+    """
+    Extract the time series of each observed property, and station information, of each
+    location in a single streaming pass. Measurement points are freed as soon as they
+    are read. Also returns the origin time of the forecast model run.
+    """
+    # Series and station info of each location, in response order. Places requested
+    # more than once, or resolving to the same station, come back as separate locations.
+    locations: List[Tuple[Dict[str, Series], Dict[str, str | None]]] = []
+    locations_by_station: Dict[Tuple, List[int]] = {}
+    model_run = None
+
+    # State of the observation and measurement point being read
+    station = {"name": None, "id": None, "position": None}
+    times = []
+    values = []
+    property_href = ""
+    time_str = None
+    value_text = None
+
+    for _, elem in ET.iterparse(source, events=("end",)):
+        tag = elem.tag
+        if not isinstance(tag, str):
             continue
 
-        property_href = observed_property.get("{http://www.w3.org/1999/xlink}href", "")
-        if not property_href:
+        if tag == _TIME:
+            time_str = elem.text
+        elif tag == _VALUE:
+            value_text = elem.text or ""
+        elif tag == _POINT:
+            if time_str and value_text is not None:
+                times.append(time_str)
+                values.append(value_text)
+            time_str = value_text = None
+            elem.clear()
+        elif tag == _OBSERVED_PROPERTY:
+            property_href = elem.get(_HREF, "")
+        elif tag == _RESULT_TIME:
+            if model_run is None:
+                model_run = elem.findtext(f".//{_TIME_POSITION}")
+        elif tag == _OBSERVATION:
+            # The observed property may come after the points, so store them only now.
+            # They belong to the first location of the station still missing the property.
+            key = (station["name"], station["id"], station["position"])
+            indexes = locations_by_station.setdefault(key, [])
+            index = next((i for i in indexes if property_href not in locations[i][0]), None)
+            if index is None:
+                index = len(locations)
+                indexes.append(index)
+                locations.append(({}, station))
+            if property_href:
+                locations[index][0][property_href] = (times, values)
+
+            station = {"name": None, "id": None, "position": None}
+            times, values = [], []
+            property_href = ""
+            elem.clear()
+        elif tag == _POSITION:
+            if station["position"] is None:
+                station["position"] = elem.text
+        elif station["name"] is None and tag.lower().endswith("name") and elem.text:
+            if len(elem.text) > 2 and len(elem.text) < 100:
+                station["name"] = elem.text
+        elif station["id"] is None and "identifier" in tag.lower() and elem.text:
+            station["id"] = elem.text
+
+    return [
+        (series, station if station["name"] or station["id"] else None)
+        for series, station in locations
+    ], model_run
+
+
+def _parse_times(times: List[str]) -> np.ndarray:
+    # FMI times are UTC with a Z suffix, which NumPy wants left out
+    return np.array([time[:-1] if time.endswith("Z") else time for time in times], "datetime64[s]")
+
+
+def _parse_value(value_text: Optional[str]) -> float:
+    try:
+        return float(value_text) if value_text and value_text != "NaN" else np.nan
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def _get_column(property_href: str) -> Optional[str]:
+    """Forecast column of an observed property."""
+    for parameter, column in PARAMETER_COLUMNS:
+        if parameter in property_href:
+            return column
+    return None
+
+
+def _build_forecast(series: Dict[str, Series]) -> Forecast:
+    """Align the time series of all properties into forecast columns."""
+    if not series:
+        return Forecast.empty()
+
+    parsed = {href: (_parse_times(times), values) for href, (times, values) in series.items()}
+    times = np.unique(np.concatenate([series_times for series_times, _ in parsed.values()]))
+
+    columns = {column: np.full(len(times), np.nan) for _, column in PARAMETER_COLUMNS}
+    for href, (series_times, values) in parsed.items():
+        column = _get_column(href)
+        if column is None:
             continue
 
-        # Find all measurement points in this observation
-        points = obs.findall(".//wml2:point", namespaces)
-
-        for point in points:
-            time_elem = point.find(".//wml2:time", namespaces)
-            value_elem = point.find(".//wml2:value", namespaces)
-
-            if time_elem is None or value_elem is None:
-                continue
-
-            time_str = time_elem.text
-            if not time_str:
-                continue
-
-            value_text = value_elem.text
-
-            try:
-                value = float(value_text) if value_text and value_text != "NaN" else None
-            except (ValueError, TypeError):
-                value = None
-
-            if time_str not in data_by_time:
-                data_by_time[time_str] = {
-                    "time": format_time(time_str),
-                    "raw_time": time_str,
-                    "temperature": None,
-                    "precipitation": None,
-                    "precipitation_probability": None,
-                    "wind_speed": None,
-                    "wind_direction": None,
-                    "humidity": None,
-                    "cloud_cover": None,
-                }
-
-            # Map weather parameter values
-            _map_weather_parameter(data_by_time[time_str], property_href, value, time_str)
-
-    return data_by_time
-
-
-def _map_weather_parameter(
-    data_point: Dict[str, Any],
-    property_href: str,
-    value: Optional[float],
-    time_str: str,
-) -> None:
-    """Map a weather parameter value to the correct field in data point."""
-    if "temperature" in property_href:
-        data_point["temperature"] = value
-    elif "Precipitation1h" in property_href:
-        data_point["precipitation"] = value
-    elif "PoP" in property_href:
-        data_point["precipitation_probability"] = _process_pop_value(value, time_str)
-    elif "WindSpeedMS" in property_href:
-        data_point["wind_speed"] = value if value is not None else 0
-    elif "WindDirection" in property_href:
-        data_point["wind_direction"] = value if value is not None else 0
-    elif "Humidity" in property_href:
-        data_point["humidity"] = value
-    elif "TotalCloudCover" in property_href:
-        data_point["cloud_cover"] = _process_cloud_cover_value(value, time_str)
-
-
-def _process_pop_value(value: Optional[float], time_str: str) -> Optional[float]:
-    """Process Probability of Precipitation value."""
-    if value is None:
-        return value
-
-    Log.debug(f"Raw PoP value: {value} for time {time_str}")
-
-    # Handle different possible value ranges
-    if value > 1:
-        pop_value = max(0, min(100, value))
-    else:
-        pop_value = max(0, min(1, value)) * 100
-
-    Log.debug(f"Processed PoP: {pop_value}% for time {time_str}")
-    return pop_value
-
-
-def _process_cloud_cover_value(value: Optional[float], time_str: str) -> Optional[int]:
-    """Process cloud cover value and convert to percentage."""
-    if value is None:
-        return value
-
-    Log.debug(f"Raw cloud cover value: {value} for time {time_str}")
-
-    # Handle different possible value ranges
-    if value > 1:
-        clamped_value = max(0, min(100, value)) / 100
-    else:
-        clamped_value = max(0, min(1, value))
-
-    cloud_percentage = int(clamped_value * 100)
-    Log.debug(f"Processed cloud cover: {cloud_percentage}% for time {time_str}")
-    return cloud_percentage
-
-
-def _process_weather_observations(
-    data_by_time: Dict[str, Dict[str, Any]],
-) -> List[Dict[str, Any]]:
-    """Process raw weather observations into sorted list."""
-    # Convert to sorted list
-    sorted_times = sorted(
-        data_by_time.keys(),
-        key=lambda x: datetime.fromisoformat(x.replace("Z", "+00:00")),
+        column_values = np.array([_parse_value(value) for value in values], dtype=float)
+        columns[column][np.searchsorted(times, series_times)] = _process_values(
+            column, column_values
+        )
+
+    columns["precipitation_probability"] = _fill_missing_pop_values(
+        columns["precipitation_probability"], columns["precipitation"]
     )
-    return [data_by_time[time_str] for time_str in sorted_times]
+
+    return Forecast.from_columns(times, columns)
 
 
-def _enrich_weather_data(weather_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Enrich weather data with calculated fields and missing value handling."""
-    if not weather_data:
-        return weather_data
+def _process_values(column: str, values: np.ndarray) -> np.ndarray:
+    """Normalize the values of a forecast column."""
+    if column in ("wind_speed", "wind_direction"):
+        return np.nan_to_num(values, nan=0)
 
-    # Fill missing PoP values with sensible defaults based on actual precipitation
-    for point in weather_data:
-        _fill_missing_pop_values(point)
+    if column == "precipitation_probability":
+        # Handle different possible value ranges
+        return np.where(values > 1, np.clip(values, 0, 100), np.clip(values, 0, 1) * 100)
 
-        # Add calculated visual fields
-        point["temperature_color"] = get_temperature_color(point["temperature"])
-        point["weather_icon"] = get_weather_icon(point["cloud_cover"], point["precipitation"])
+    if column == "cloud_cover":
+        # Handle different possible value ranges, and convert to whole percentages
+        clamped = np.where(values > 1, np.clip(values, 0, 100) / 100, np.clip(values, 0, 1))
+        return np.trunc(clamped * 100)
 
-    return weather_data
+    return values
 
 
-def _fill_missing_pop_values(point: Dict[str, Any]) -> None:
+def _fill_missing_pop_values(
+    precipitation_probability: np.ndarray, precipitation: np.ndarray
+) -> np.ndarray:
     """Fill missing PoP values based on precipitation data."""
     # If PoP is missing or 0, but there's actual precipitation, estimate PoP
-    if (
-        (point["precipitation_probability"] is None or point["precipitation_probability"] == 0)
-        and point["precipitation"] is not None
-        and point["precipitation"] > 0
-    ):
-        # Estimate PoP based on precipitation amount
-        if point["precipitation"] >= 2.0:
-            point["precipitation_probability"] = 90  # Heavy rain = high probability
-        elif point["precipitation"] >= 0.5:
-            point["precipitation_probability"] = 70  # Moderate rain = medium probability
-        elif point["precipitation"] >= 0.1:
-            point["precipitation_probability"] = 50  # Light rain = moderate probability
-        else:
-            point["precipitation_probability"] = 20  # Trace amounts = low probability
+    estimate = (np.isnan(precipitation_probability) | (precipitation_probability == 0)) & (
+        precipitation > 0
+    )
+
+    # Estimate PoP based on precipitation amount
+    estimated = np.select(
+        [precipitation >= 2.0, precipitation >= 0.5, precipitation >= 0.1],
+        [
+            90,  # Heavy rain = high probability
+            70,  # Moderate rain = medium probability
+            50,  # Light rain = moderate probability
+        ],
+        20,  # Trace amounts = low probability
+    )
+
     # If still no PoP value, default to 0
-    elif point["precipitation_probability"] is None:
-        point["precipitation_probability"] = 0
+    filled = np.where(estimate, estimated, precipitation_probability)
+    return np.nan_to_num(filled, nan=0)
@@ -7,6 +7,16 @@ from swimmi.utils import get_epoch
 class SwimmiAPI(BaseAPI):
     """Timmi API client."""
 
+    # Timmi keeps the calendar day in the backend session, and moving it is a GET,
+    # so a retried request could move the day twice.
+    retries = 0
+    # The login sets the session cookie, so it must be sent by every client itself.
+    coalesce_requests = False
+
+    rate_limit = 2.0
+    rate_burst = 2
+    max_concurrency = 2
+
     def __init__(self, host: str, login_params: dict, room_parts_params: dict):
         super().__init__(host)
         self.login_params = login_params
@@ -75,14 +85,17 @@ class SwimmiAPI(BaseAPI):
         # Note that this sets the backend session to fetch all episodes for given
         # list of rooms in the next step.
         response = self.get_room_parts()
-        if not response:
+        if not response.ok:
             Log.warning("No room data received! Aborting...")
             raise Exception("No room data received.")
 
-        room_parts = response.data if response.ok else []
+        room_parts = response.data
 
         # Fetch episodes and add events to rooms
         response2 = self.get_episodes()
-        episodes = response2.data if response2.ok else []
+        if not response2.ok:
+            raise Exception(f"Episode request failed with status {response2.status}")
+
+        episodes = response2.data
 
         return room_parts, episodes
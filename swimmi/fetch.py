@@ -24,7 +24,20 @@ def _fetch_extra_hours(params: SwimmiConfig) -> list[ExtraOpenHours]:
     return []
 
 
-@cache_output("swimmi_raw", RawData)
+@cache_output(
+    "swimmi_raw",
+    RawData,
+    key=lambda params: params.model_dump(
+        include={
+            "host",
+            "login_params",
+            "room_parts_params",
+            "future_days_count",
+            "past_days_count",
+            "baserow",
+        }
+    ),
+)
 def fetch_multi(params: SwimmiConfig) -> RawData:
     """Fetch all relevant data from Timmi for multiple days."""
     api = SwimmiAPI(params.host, params.login_params, params.room_parts_params)
@@ -3,6 +3,7 @@ import os
 
 from config import register_runner, get_output_dir
 from utils.renderers import render_html, save_file
+from utils.tracing import span
 
 from .config import SwimmiConfig
 from .fetch import fetch_multi
@@ -10,15 +11,17 @@ from .transform import transform_multi
 from .utils import get_epoch, ymd
 
 
-@register_runner("swimmi", SwimmiConfig, "Human-readable swimming pool schedule")
+@register_runner("swimmi", SwimmiConfig)
 def run_swimmi(params: SwimmiConfig) -> None:
     """Fetch, process and render swimming pool schedules for multiple days"""
 
     # 1. Fetch raw data
-    raw_data = fetch_multi(params)
+    with span("fetch"):
+        raw_data = fetch_multi(params)
 
     # 2. Transform raw data
-    transformed_data = transform_multi(raw_data, params)
+    with span("transform"):
+        transformed_data = transform_multi(raw_data, params)
 
     # 3. Render multi-day HTML pages
     template_path = "swimmi/template.html"  # Hardcoded template path
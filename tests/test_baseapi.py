@@ -0,0 +1,75 @@
+import threading
+import time
+from functools import partial
+
+import pytest
+import requests
+
+from utils import circuitbreaker
+from utils.baseapi import BaseAPI
+
+
+class FlakyAPI(BaseAPI):
+    retries = 0
+    breaker_failures = 1
+    breaker_reset_seconds = 0.0
+
+
+def make_response(status: int) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = b"{}"
+    return response
+
+
+def test_rate_limited_trial_does_not_keep_circuit_open(monkeypatch):
+    monkeypatch.setattr(circuitbreaker, "_breakers", {})
+    api = FlakyAPI("https://flaky.example")
+    statuses = iter([500, 429, 200])
+    monkeypatch.setattr(
+        api, "_timed_request", lambda method, url, config: make_response(next(statuses))
+    )
+
+    assert api.request("GET", "/a").status == 500
+    assert api.request("GET", "/b").status == 429
+    assert api.request("GET", "/c").status == 200
+
+
+class StatefulAPI(BaseAPI):
+    coalesce_requests = False
+
+
+def make_client_with_cookie() -> BaseAPI:
+    api = BaseAPI("https://stateful.example")
+    api._session.cookies.set("JSESSIONID", "abc")
+    return api
+
+
+@pytest.mark.parametrize(
+    "make_client", [lambda: StatefulAPI("https://stateful.example"), make_client_with_cookie]
+)
+def test_stateful_clients_send_their_own_requests(monkeypatch, make_client):
+    monkeypatch.setattr(circuitbreaker, "_breakers", {})
+    sent = []
+    release = threading.Event()
+
+    def send(api, method, url, config):
+        sent.append(api)
+        release.wait(5)
+        return make_response(200)
+
+    clients = [make_client() for _ in range(2)]
+    threads = []
+    for client in clients:
+        monkeypatch.setattr(client, "_timed_request", partial(send, client))
+        threads.append(threading.Thread(target=client.request, args=("GET", "/login")))
+        threads[-1].start()
+    # Coalesced requests would leave the second client waiting for the first one.
+    deadline = time.monotonic() + 2
+    while len(sent) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(map(id, sent)) == sorted(map(id, clients))
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+import config
+from utils.baseapi import ApiResponse
+from utils import cache
+from utils.cache import cache_output
+from uutta.api import RSSFetcher
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CLI_CONTEXT", config.CliConfig(cache_dir=str(tmp_path)))
+    return tmp_path
+
+
+def test_falls_back_to_last_cached_data_when_fetch_raises():
+    results = [["first"]]
+
+    @cache_output("test_fallback", list)
+    def fetch():
+        if not results:
+            raise RuntimeError("upstream down")
+        return results.pop()
+
+    assert fetch() == ["first"]
+    config.CLI_CONTEXT.ignore_cache = True
+    assert fetch() == ["first"]
+
+
+def test_failed_feed_raises_instead_of_returning_no_articles(monkeypatch):
+    fetcher = RSSFetcher("https://feed.example/rss")
+    failed = ApiResponse(data="Circuit is open", status=503, ok=False)
+    monkeypatch.setattr(fetcher, "request", lambda *args, **kwargs: failed)
+
+    with pytest.raises(RuntimeError):
+        fetcher.fetch_rss()
+
+
+def test_concurrent_callers_share_one_download():
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    @cache_output("test_single_download", list)
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return ["data"]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fetch())) for _ in range(3)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == [["data"]] * 3
+
+
+def test_key_locks_are_released_after_use():
+    @cache_output("test_key_locks", list)
+    def fetch(value):
+        return [value]
+
+    for value in range(5):
+        fetch(value)
+
+    assert not any(key.startswith("test_key_locks") for key in cache._key_locks)
@@ -0,0 +1,54 @@
+import os
+import time
+
+import pytest
+
+from utils.cachemanager import DAY_SECONDS, prune_cache
+from utils.cachestore import FileCacheStore, SQLiteCacheStore
+
+
+@pytest.fixture(params=[SQLiteCacheStore, FileCacheStore])
+def store(request, tmp_path):
+    return request.param(str(tmp_path))
+
+
+def put_entries(store, *keys):
+    for key in keys:
+        # Incompressible, so every entry takes the same 1000 bytes in any store
+        store.put(key, "test", os.urandom(1000))
+
+
+def keys(store):
+    return sorted(entry.key for entry in store.entries())
+
+
+def test_evicts_least_recently_used_first(store):
+    put_entries(store, "test_a", "test_b", "test_c")
+    time.sleep(0.01)
+    store.get("test_a")
+    time.sleep(0.01)
+    store.stamp("test_b")
+
+    count, size = prune_cache(store, max_bytes=2500)
+
+    assert (count, size) == (1, 1000)
+    assert keys(store) == ["test_a", "test_b"]
+
+
+def test_keeps_everything_within_budget(store):
+    put_entries(store, "test_a", "test_b")
+
+    assert prune_cache(store, max_bytes=2000) == (0, 0)
+    assert keys(store) == ["test_a", "test_b"]
+
+
+def test_deletes_expired_entries_however_recently_used(store):
+    put_entries(store, "test_old")
+    time.sleep(0.3)
+    put_entries(store, "test_new")
+    store.get("test_old")
+
+    count, _ = prune_cache(store, max_age_days=0.15 / DAY_SECONDS)
+
+    assert count == 1
+    assert keys(store) == ["test_new"]
@@ -0,0 +1,68 @@
+from utils.circuitbreaker import CircuitBreaker
+
+
+def open_breaker(monkeypatch, failures=2, reset_seconds=10.0):
+    clock = [100.0]
+    monkeypatch.setattr("utils.circuitbreaker.time.monotonic", lambda: clock[0])
+
+    breaker = CircuitBreaker("example.com", failures, reset_seconds)
+    for _ in range(failures):
+        assert breaker.allow()
+        breaker.record_failure()
+    return breaker, clock
+
+
+def test_opens_after_consecutive_failures(monkeypatch):
+    breaker, _ = open_breaker(monkeypatch)
+
+    assert not breaker.allow()
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker("example.com", failures=2, reset_seconds=10.0)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.allow()
+
+
+def test_single_trial_after_reset_period(monkeypatch):
+    breaker, clock = open_breaker(monkeypatch)
+    clock[0] += 10.0
+
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_successful_trial_closes(monkeypatch):
+    breaker, clock = open_breaker(monkeypatch)
+    clock[0] += 10.0
+    breaker.allow()
+    breaker.record_success()
+
+    assert breaker.allow()
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens(monkeypatch):
+    breaker, clock = open_breaker(monkeypatch)
+    clock[0] += 10.0
+    breaker.allow()
+    breaker.record_failure()
+
+    assert not breaker.allow()
+    clock[0] += 10.0
+    assert breaker.allow()
+
+
+def test_released_trial_lets_another_through(monkeypatch):
+    breaker, clock = open_breaker(monkeypatch)
+    clock[0] += 10.0
+    breaker.allow()
+    breaker.release_trial()
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
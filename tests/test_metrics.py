@@ -0,0 +1,38 @@
+import math
+
+import pytest
+
+from utils import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_series(monkeypatch):
+    monkeypatch.setattr(metrics, "_series", {})
+
+
+def test_request_counts_and_buckets():
+    metrics.record_request("example.com", "/a", 0.02, ok=True, size=100)
+    metrics.record_request("example.com", "/a", 0.3, ok=False)
+
+    text = metrics.format_metrics()
+
+    labels = '{host="example.com",endpoint="/a"}'
+    assert f"salo_upstream_requests_total{labels} 2" in text
+    assert f"salo_upstream_errors_total{labels} 1" in text
+    assert f"salo_upstream_response_bytes_total{labels} 100" in text
+    assert (
+        'salo_upstream_request_duration_seconds_bucket{host="example.com",endpoint="/a",le="+Inf"} 2'
+        in text
+    )
+    assert text.endswith("# EOF\n")
+
+
+def test_non_finite_values_use_openmetrics_tokens():
+    metrics.record_request("example.com", "/a", math.inf, ok=False)
+    metrics.record_request("example.com", "/b", math.nan, ok=False)
+
+    text = metrics.format_metrics()
+
+    assert "+Inf\n" in text
+    assert "NaN\n" in text
+    assert " inf\n" not in text and " nan\n" not in text
@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from utils.paths import write_atomic
+
+
+def test_creates_directories_and_file(tmp_path):
+    path = tmp_path / "a" / "b" / "index.html"
+
+    write_atomic(str(path), b"hello")
+
+    assert path.read_bytes() == b"hello"
+    assert os.stat(path).st_mode & 0o777 == 0o644
+
+
+def test_replaces_existing_content(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_bytes(b"old content that is longer")
+
+    write_atomic(str(path), b"new")
+
+    assert path.read_bytes() == b"new"
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_failed_write_keeps_old_content(tmp_path, monkeypatch):
+    path = tmp_path / "data.json"
+    path.write_bytes(b"old")
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        write_atomic(str(path), b"new")
+
+    assert path.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["data.json"]
@@ -0,0 +1,81 @@
+import threading
+import time
+
+from utils.ratelimit import HostLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def limiter_with_clock(monkeypatch, *args):
+    clock = FakeClock()
+    monkeypatch.setattr("utils.ratelimit.time", clock)
+    return HostLimiter("example.com", *args), clock
+
+
+def test_burst_goes_through_without_waiting(monkeypatch):
+    limiter, clock = limiter_with_clock(monkeypatch, 2.0, 3, None)
+
+    for _ in range(3):
+        with limiter.slot() as waited:
+            assert waited == 0
+
+    assert clock.sleeps == []
+
+
+def test_waits_for_tokens_beyond_the_burst(monkeypatch):
+    limiter, clock = limiter_with_clock(monkeypatch, 2.0, 1, None)
+
+    waits = []
+    for _ in range(3):
+        with limiter.slot() as waited:
+            waits.append(waited)
+
+    assert waits == [0, 0.5, 0.5]
+
+
+def test_tokens_refill_up_to_the_burst(monkeypatch):
+    limiter, clock = limiter_with_clock(monkeypatch, 2.0, 2, None)
+    for _ in range(2):
+        with limiter.slot():
+            pass
+
+    clock.now += 60
+    for _ in range(2):
+        with limiter.slot() as waited:
+            assert waited == 0
+    with limiter.slot() as waited:
+        assert waited == 0.5
+
+
+def test_caps_requests_in_flight():
+    limiter = HostLimiter("example.com", None, 1, 2)
+    lock = threading.Lock()
+    running = [0, 0]  # now, most at once
+
+    def request():
+        with limiter.slot():
+            with lock:
+                running[0] += 1
+                running[1] = max(running[1], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+
+    threads = [threading.Thread(target=request) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert running == [0, 2]
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import numpy as np
+
+from saa.transform import PARAMETER_COLUMNS, Forecast, merge_forecasts
+
+
+def make_forecast(start_hour: int, hours: int, step: int = 1, offset: float = 0.0) -> Forecast:
+    """Hourly (or `step` hourly) forecast from 2026-10-16 `start_hour`:00 UTC."""
+    first = np.datetime64(f"2026-10-16T{start_hour:02d}:00:00", "s")
+    times = first + np.arange(0, hours, step) * np.timedelta64(3600, "s")
+    values = np.arange(len(times), dtype=float) + offset
+    return Forecast.from_columns(times, {name: values.copy() for _, name in PARAMETER_COLUMNS})
+
+
+def test_between_is_inclusive():
+    forecast = make_forecast(0, 24)
+
+    window = forecast.between(datetime(2026, 10, 16, 3), datetime(2026, 10, 16, 5))
+
+    assert window.times.tolist() == forecast.times[3:6].tolist()
+    assert window.temperature.tolist() == [3.0, 4.0, 5.0]
+    assert window.weather_icon.tolist() == forecast.weather_icon[3:6].tolist()
+
+
+def test_between_outside_the_forecast_is_empty():
+    forecast = make_forecast(0, 24)
+
+    assert len(forecast.between(datetime(2026, 10, 17, 1), datetime(2026, 10, 17, 5))) == 0
+    assert len(forecast.between(datetime(2026, 10, 15), datetime(2026, 10, 16))) == 1
+
+
+def test_bytes_round_trip():
+    forecast = make_forecast(6, 12)
+    columns = {name: getattr(forecast, name) for _, name in PARAMETER_COLUMNS}
+    columns["precipitation"][2] = np.nan
+    forecast = Forecast.from_columns(forecast.times, columns)
+
+    loaded = Forecast.from_bytes(forecast.to_bytes())
+
+    assert loaded.times.dtype == np.dtype("datetime64[s]")
+    assert loaded.times.tolist() == forecast.times.tolist()
+    for _, name in PARAMETER_COLUMNS:
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(forecast, name))
+    assert loaded.temperature_color.tolist() == forecast.temperature_color.tolist()
+    assert loaded.weather_icon.tolist() == forecast.weather_icon.tolist()
+
+
+def test_empty_round_trip():
+    assert len(Forecast.from_bytes(Forecast.empty().to_bytes())) == 0
+
+
+def test_nowcast_replaces_overlapping_steps():
+    forecast = make_forecast(0, 12)
+    # 15-minute steps from 02:00 to 04:00
+    first = np.datetime64("2026-10-16T02:00:00", "s")
+    times = first + np.arange(9) * np.timedelta64(900, "s")
+    nowcast = Forecast.from_columns(
+        times, {name: np.full(9, 100.0) for _, name in PARAMETER_COLUMNS}
+    )
+
+    merged = merge_forecasts(forecast, nowcast)
+
+    assert len(merged) == 2 + 9 + 7
+    assert np.all(np.diff(merged.times) > np.timedelta64(0, "s"))
+    assert merged.temperature[:2].tolist() == [0.0, 1.0]
+    assert merged.temperature[2:11].tolist() == [100.0] * 9
+    assert merged.temperature[11:].tolist() == forecast.temperature[5:].tolist()
+    assert merged.weather_icon.tolist()[2:11] == nowcast.weather_icon.tolist()
+
+
+def test_empty_nowcast_keeps_forecast():
+    forecast = make_forecast(0, 12)
+
+    assert merge_forecasts(forecast, Forecast.empty()) is forecast
@@ -0,0 +1,100 @@
+import io
+
+from saa.fetch import _match_locations
+from saa.transform import _parse_forecast, parse_weather_xml
+
+HEADER = (
+    '<wfs:FeatureCollection xmlns:wfs="http://www.opengis.net/wfs/2.0"'
+    ' xmlns:om="http://www.opengis.net/om/2.0"'
+    ' xmlns:omso="http://inspire.ec.europa.eu/schemas/omso/3.0"'
+    ' xmlns:gml="http://www.opengis.net/gml/3.2"'
+    ' xmlns:xlink="http://www.w3.org/1999/xlink"'
+    ' xmlns:wml2="http://www.opengis.net/waterml/2.0">'
+)
+PARAMETERS = ("temperature", "WindSpeedMS")
+
+
+def observation(name, position, parameter, values):
+    points = "".join(
+        f"<wml2:point><wml2:MeasurementTVP><wml2:time>2026-10-16T{12 + hour}:00:00Z</wml2:time>"
+        f"<wml2:value>{value}</wml2:value></wml2:MeasurementTVP></wml2:point>"
+        for hour, value in enumerate(values)
+    )
+    return (
+        "<wfs:member><omso:PointTimeSeriesObservation>"
+        "<om:resultTime><gml:TimeInstant><gml:timePosition>2026-10-16T09:00:00Z"
+        "</gml:timePosition></gml:TimeInstant></om:resultTime>"
+        f'<om:observedProperty xlink:href="https://opendata.fmi.fi/meta?param={parameter}"/>'
+        f"<om:featureOfInterest><gml:identifier>{name}-id</gml:identifier>"
+        f"<gml:name>{name}</gml:name><gml:pos>{position} </gml:pos></om:featureOfInterest>"
+        f"<om:result><wml2:MeasurementTimeseries>{points}</wml2:MeasurementTimeseries>"
+        "</om:result></omso:PointTimeSeriesObservation></wfs:member>"
+    )
+
+
+def response(*stations, by_parameter=False):
+    """A forecast response for (name, position, values) stations."""
+    if by_parameter:
+        members = [
+            observation(name, position, parameter, values)
+            for parameter in PARAMETERS
+            for name, position, values in stations
+        ]
+    else:
+        members = [
+            observation(name, position, parameter, values)
+            for name, position, values in stations
+            for parameter in PARAMETERS
+        ]
+    return (HEADER + "".join(members) + "</wfs:FeatureCollection>").encode("utf-8")
+
+
+def test_locations_in_response_order():
+    xml = response(("Salo", "60.38 23.12", [1, 2]), ("Turku", "60.45 22.26", [3, 4, 5]))
+
+    locations, model_run = _parse_forecast(io.BytesIO(xml))
+
+    assert model_run == "2026-10-16T09:00:00Z"
+    assert [station["name"] for _, station in locations] == ["Salo", "Turku"]
+    assert [station["position"] for _, station in locations] == ["60.38 23.12 ", "60.45 22.26 "]
+    series, _ = locations[1]
+    assert len(series) == len(PARAMETERS)
+    assert all(values == ["3", "4", "5"] for _, values in series.values())
+
+
+def test_same_station_twice_is_two_locations():
+    for by_parameter in (False, True):
+        xml = response(
+            ("Salo", "60.38 23.12", [1]),
+            ("Salo", "60.38 23.12", [1]),
+            ("Turku", "60.45 22.26", [2]),
+            by_parameter=by_parameter,
+        )
+
+        locations, _ = _parse_forecast(io.BytesIO(xml))
+
+        assert [station["name"] for _, station in locations] == ["Salo", "Salo", "Turku"]
+        assert all(len(series) == len(PARAMETERS) for series, _ in locations)
+
+
+def test_parsed_forecast_columns():
+    xml = response(("Salo", "60.38 23.12", [1.5, "NaN"]))
+
+    (location,) = parse_weather_xml(xml)
+
+    assert location["station_info"]["name"] == "Salo"
+    assert location["data"].temperature[0] == 1.5
+    assert len(location["data"]) == 2
+
+
+def test_missing_location_keeps_the_rest_of_the_batch():
+    locations = parse_weather_xml(
+        response(("Salo", "60.38 23.12", [1]), ("Oulu", "65.01 25.47", [2]))
+    )
+
+    matches = _match_locations(["salo", "Turku", "65.01,25.47"], locations)
+
+    assert [(place, location["station_info"]["name"]) for place, location in matches] == [
+        ("salo", "Salo"),
+        ("65.01,25.47", "Oulu"),
+    ]
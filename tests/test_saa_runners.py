@@ -0,0 +1,15 @@
+from saa.config import SaaConfig
+from saa.runners import _get_output_paths
+
+
+def test_single_place_renders_the_index():
+    assert _get_output_paths(SaaConfig(output_dir="out"), "salo") == ["out/index.html"]
+    config = SaaConfig(output_dir="out", places=["Salo", "Salo"])
+    assert _get_output_paths(config, "Salo") == ["out/index.html"]
+
+
+def test_first_of_several_places_also_renders_the_index():
+    config = SaaConfig(output_dir="out", places=["Salo", "60.45,22.26"])
+
+    assert _get_output_paths(config, "Salo") == ["out/salo/index.html", "out/index.html"]
+    assert _get_output_paths(config, "60.45,22.26") == ["out/60-45-22-26/index.html"]
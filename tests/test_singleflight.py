@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+
+def run_concurrently(flight, count, function, copy=lambda r: r):
+    """Start `count` calls of the same key while the first one is still running."""
+    release = threading.Event()
+    results = []
+    errors = []
+
+    def leader_function():
+        release.wait(5)
+        return function()
+
+    def call():
+        try:
+            results.append(flight.do("key", leader_function, copy))
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    try:
+        while flight.waiters("key") < count - 1:
+            assert time.monotonic() < deadline, "Callers didn't join the call in flight"
+            time.sleep(0.001)
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+    return results, errors
+
+
+def test_concurrent_calls_run_once():
+    calls = []
+    results, _ = run_concurrently(SingleFlight(), 4, lambda: calls.append(1) or "done")
+
+    assert calls == [1]
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+    assert all(result == "done" for result, _ in results)
+
+
+def test_waiters_get_their_own_copy():
+    results, _ = run_concurrently(SingleFlight(), 3, lambda: {"items": []}, copy=dict)
+
+    values = [result for result, _ in results]
+    assert all(value == {"items": []} for value in values)
+    assert len({id(value) for value in values}) == 3
+
+
+def test_error_is_raised_to_every_caller():
+    def fail():
+        raise ValueError("boom")
+
+    results, errors = run_concurrently(SingleFlight(), 3, fail)
+
+    assert results == []
+    assert len(errors) == 3
+    assert all(isinstance(error, ValueError) for error in errors)
+
+
+def test_later_calls_run_again():
+    flight = SingleFlight()
+    calls = []
+
+    flight.do("key", lambda: calls.append(1))
+    flight.do("key", lambda: calls.append(1))
+
+    assert len(calls) == 2
+
+
+def test_key_is_released_after_error():
+    flight = SingleFlight()
+
+    with pytest.raises(ValueError):
+        flight.do("key", lambda: (_ for _ in ()).throw(ValueError()))
+
+    assert flight.do("key", lambda: "ok") == ("ok", False)
+
+
+def test_waiters_of_a_key_without_a_call():
+    assert SingleFlight().waiters("key") == -1
@@ -4,6 +4,8 @@ from utils.baseapi import BaseAPI
 class EventCalendarAPI(BaseAPI):
     """API client for tapahtumat.salo.fi data."""
 
+    http_cache = True
+
     def __init__(self, base_url: str):
         super().__init__(base_url)
 
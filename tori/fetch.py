@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from utils.cache import cache_output
 
 from .api import EventCalendarAPI
@@ -5,10 +7,17 @@ from .config import ToriConfig
 from .schema import RawData
 
 
-@cache_output("tori_raw", RawData)
+@cache_output(
+    "tori_raw",
+    RawData,
+    prewarm=timedelta(minutes=30),
+    key=lambda params: params.api_base_url,
+)
 def fetch_events(params: ToriConfig) -> RawData:
     api = EventCalendarAPI(params.api_base_url)
 
     response = api.get_events()
+    if not response.ok:
+        raise RuntimeError(f"Event request failed with status {response.status}")
 
     return RawData(events=response.data["posts"])
@@ -3,21 +3,24 @@ import os
 
 from config import register_runner, get_output_dir
 from utils.renderers import render_html, save_file
+from utils.tracing import span
 
 from .config import ToriConfig
 from .fetch import fetch_events
 from .transform import transform_events
 
 
-@register_runner("tori", ToriConfig, "Local event calendar")
+@register_runner("tori", ToriConfig)
 def run_tori(params: ToriConfig) -> None:
     """Fetch, process and render event calendar"""
 
     # 1. Fetch raw event data
-    raw_data = fetch_events(params)
+    with span("fetch"):
+        raw_data = fetch_events(params)
 
     # 2. Transform events data
-    transformed_data = transform_events(raw_data, params)
+    with span("transform"):
+        transformed_data = transform_events(raw_data, params)
 
     # 3. Render events HTML page
     template_path = "tori/template.html"  # Hardcoded template path
@@ -0,0 +1,61 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Coroutine, Optional, Union
+
+from utils.baseapi import ApiResponse, BaseAPI
+from utils.constants import DEFAULT_ASYNC_HTTP_WORKERS
+
+# Shared worker pool for the blocking HTTP I/O. The event loop itself never blocks.
+_executor = ThreadPoolExecutor(
+    max_workers=DEFAULT_ASYNC_HTTP_WORKERS, thread_name_prefix="async-http"
+)
+
+
+class AsyncBaseAPI:
+    """Asyncio HTTP API wrapper with the same `request()`/`ApiResponse` contract as BaseAPI.
+
+    Requests are awaitable, so a fetch stage can fan out many of them concurrently with
+    `asyncio.gather()`. The event loop stays on the caller's thread, while each request's
+    blocking I/O runs in a shared pool of `DEFAULT_ASYNC_HTTP_WORKERS` threads.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Union[dict, None] = None,
+        client: Optional[BaseAPI] = None,
+    ):
+        self._client = client or BaseAPI(base_url, headers)
+        self.base_url = self._client.base_url
+
+    @classmethod
+    def from_client(cls, client: BaseAPI) -> "AsyncBaseAPI":
+        """Wrap an existing sync client, sharing its session, headers and cookies."""
+        return cls(client.base_url, client=client)
+
+    async def request(
+        self, method: str, endpoint: str, config: Union[dict, None] = None, useJSON=True
+    ) -> ApiResponse:
+        loop = asyncio.get_running_loop()
+        # Copy the context so the worker sees the same CLI context as the caller.
+        context = contextvars.copy_context()
+        call = partial(self._client.request, method, endpoint, config, useJSON)
+
+        return await loop.run_in_executor(_executor, context.run, call)
+
+
+def run_sync(coroutine: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Run a coroutine to completion from synchronous code, e.g. a runner's fetch stage.
+    Must not be called while an event loop is running in the same thread; await the
+    coroutine there instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    coroutine.close()  # Never awaited, don't warn about it
+    raise RuntimeError("run_sync() called from a running event loop, await instead")
@@ -1,23 +1,178 @@
+import copy
+import json
+import random
+import time
 import urllib.parse
-from typing import Any, Union
+from functools import partial
+from typing import Any, Optional, Union
 
-from pydantic import BaseModel
 import requests
+from requests.compat import chardet
+from requests.utils import get_encoding_from_headers
 
+from utils import httpcache
+from utils.cassette import is_cassette_active, is_replaying
+from utils.circuitbreaker import CircuitOpenError, get_circuit_breaker
+from utils.connections import create_session
+from utils.constants import (
+    DEFAULT_CIRCUIT_BREAKER_FAILURES,
+    DEFAULT_CIRCUIT_BREAKER_RESET_SECONDS,
+    DEFAULT_HTTP_BACKOFF_SECONDS,
+    DEFAULT_HTTP_MAX_CONCURRENCY,
+    DEFAULT_HTTP_RATE_BURST,
+    DEFAULT_HTTP_RATE_PER_SECOND,
+    DEFAULT_HTTP_RETRIES,
+    DEFAULT_HTTP_TIMEOUT_SECONDS,
+    HTTP_BACKOFF_MAX_SECONDS,
+    HTTP_IDEMPOTENT_METHODS,
+    HTTP_RETRY_STATUSES,
+)
 from utils.logging import Log
+from utils.metrics import record_request
+from utils.ratelimit import get_host_limiter
+from utils.singleflight import SingleFlight
+from utils.tracing import span
 
+try:
+    import orjson
+except ImportError:  # Optional, the standard library json is always available
+    orjson = None
 
-class ApiResponse(BaseModel):
-    data: Any
-    status: int
-    ok: bool
+# GETs in flight across all clients, see `BaseAPI.request()`.
+_in_flight = SingleFlight()
+
+_UNDECODED = object()
+_UTF8 = ("utf-8", "utf8", "ascii")
+
+
+class ApiResponse:
+    """
+    Result of an API request.
+
+    Keeps the raw body bytes and decodes them on first use: into parsed JSON, or into
+    text when requested with `useJSON=False`. Like before, a JSON body that doesn't
+    parse turns the response into a failed one (status 500, error message as `data`).
+    """
+
+    __slots__ = ("raw", "encoding", "_json", "_data", "_status", "_ok")
+
+    def __init__(
+        self,
+        data: Any = None,
+        status: int = 200,
+        ok: bool = True,
+        raw: Optional[bytes] = None,
+        encoding: Optional[str] = None,
+        useJSON: bool = True,
+    ):
+        self.raw = raw
+        self.encoding = encoding
+        self._json = useJSON
+        self._data = _UNDECODED if raw is not None else data
+        self._status = status
+        self._ok = ok
+
+    @classmethod
+    def from_body(
+        cls, raw: bytes, status: int, encoding: Optional[str], useJSON: bool
+    ) -> "ApiResponse":
+        return cls(
+            status=status, ok=200 <= status < 400, raw=raw, encoding=encoding, useJSON=useJSON
+        )
+
+    @property
+    def data(self) -> Any:
+        self._decode()
+        return self._data
+
+    @property
+    def status(self) -> int:
+        if self._json:
+            self._decode()
+        return self._status
+
+    @property
+    def ok(self) -> bool:
+        if self._json:
+            self._decode()
+        return self._ok
+
+    @property
+    def text(self) -> str:
+        """The raw body as text."""
+        encoding = self.encoding or "utf-8"
+        try:
+            return self.raw.decode(encoding)
+        except UnicodeDecodeError:
+            if self.encoding:
+                return self.raw.decode(encoding, errors="replace")
+
+        # No charset given and not UTF-8, guess with the detector requests itself uses.
+        detected = chardet.detect(self.raw)["encoding"] if chardet else None
+        return self.raw.decode(detected or "utf-8", errors="replace")
+
+    def _decode(self):
+        if self._data is not _UNDECODED:
+            return
+
+        if not self._json:
+            self._data = self.text
+            return
+
+        try:
+            if self.encoding and self.encoding.lower() not in _UTF8:
+                self._data = json.loads(self.text)
+            elif orjson:
+                self._data = orjson.loads(self.raw)
+            else:
+                self._data = json.loads(self.raw)
+        except ValueError as error:
+            Log.error("Error decoding response: %s", error)
+            self._data, self._status, self._ok = str(error), 500, False
+
+    def copy(self) -> "ApiResponse":
+        """Copy that shares the (immutable) raw body, but not decoded data."""
+        if self.raw is not None:
+            return ApiResponse.from_body(self.raw, self._status, self.encoding, self._json)
+        return ApiResponse(copy.deepcopy(self._data), self._status, self._ok, useJSON=self._json)
+
+    def __repr__(self) -> str:
+        size = f"{len(self.raw)} bytes" if self.raw is not None else repr(self._data)
+        return f"ApiResponse(status={self._status}, ok={self._ok}, {size})"
 
 
 class BaseAPI:
-    """Simple HTTP API wrapper."""
+    """Simple HTTP API wrapper.
+
+    Clients are cheap to create: connections are pooled per host and shared by all clients.
+
+    Subclasses set `http_cache = True` to keep GET responses in the HTTP cache and
+    revalidate them with conditional requests (see `utils.httpcache`).
+
+    Idempotent requests are retried on connection errors and transient statuses, with
+    exponential backoff. Failures are counted per host, and after enough of them in a row
+    requests to that host fail fast for a while (see `utils.circuitbreaker`).
+
+    Requests to each host are also limited in rate and concurrency (see `utils.ratelimit`),
+    with the settings of the first client that talks to the host. Identical GETs in flight
+    at the same time are sent only once, unless the session holds cookies or the subclass
+    sets `coalesce_requests = False`. Subclasses tune all of this with the class attributes
+    below.
+    """
+
+    http_cache = False
+    timeout = DEFAULT_HTTP_TIMEOUT_SECONDS
+    retries = DEFAULT_HTTP_RETRIES
+    backoff_seconds = DEFAULT_HTTP_BACKOFF_SECONDS
+    breaker_failures = DEFAULT_CIRCUIT_BREAKER_FAILURES
+    breaker_reset_seconds = DEFAULT_CIRCUIT_BREAKER_RESET_SECONDS
+    rate_limit = DEFAULT_HTTP_RATE_PER_SECOND
+    rate_burst = DEFAULT_HTTP_RATE_BURST
+    max_concurrency = DEFAULT_HTTP_MAX_CONCURRENCY
+    coalesce_requests = True
 
     def __init__(self, base_url: str, headers: Union[dict, None] = None):
-        self._session = requests.Session()
+        self._session = create_session()
         self._session.headers.update(
             {
                 "Content-Type": "application/json",
@@ -39,18 +194,151 @@ class BaseAPI:
         url = f"{self.base_url}{endpoint}"
         qs = urllib.parse.urlencode(config.get("params", {}))
 
+        with span(f"{method} {url}", "http", params=qs) as trace:
+            # A response may set cookies, which only the session that sent the request
+            # would get, so sessions with state of their own never share requests.
+            if method.upper() != "GET" or not self.coalesce_requests or self._session.cookies:
+                return self._perform(method, url, qs, config, useJSON, trace)
+
+            # Identical GETs already in flight (e.g. from parallel runners) are made only once.
+            key = (
+                url,
+                json.dumps(config, sort_keys=True, default=str),
+                tuple(sorted(self._session.headers.items())),
+                useJSON,
+            )
+            request = partial(self._perform, method, url, qs, config, useJSON, trace)
+            response, shared = _in_flight.do(key, request, ApiResponse.copy)
+
+            if shared:
+                Log.debug("[%s] %s%s (coalesced)", response.status, url, qs)
+                trace["status"] = response.status
+                trace["coalesced"] = True
+            return response
+
+    def _perform(
+        self, method: str, url: str, qs: str, config: dict, useJSON: bool, trace: dict
+    ) -> ApiResponse:
+        """Make a request through the HTTP cache, retries and circuit breaker."""
+        # Import here to avoid circular imports
+        from config import should_ignore_cache
+
         try:
-            response = self._session.request(method, url, **config)
+            cache_key = cached = None
+            # Recorded and replayed builds always go all the way to the transport.
+            if self.http_cache and method.upper() == "GET" and not is_cassette_active():
+                headers = {**self._session.headers, **config.get("headers", {})}
+                cache_key = httpcache.get_http_cache_key(url, config.get("params"), headers)
+                cached = httpcache.load_response(cache_key)
+
+            # Even when ignoring the app cache, a stored response is still revalidated.
+            if cached and httpcache.is_fresh(cached) and not should_ignore_cache():
+                Log.debug("[cached] %s%s", url, qs)
+                trace["status"] = "cached"
+                return self._cached_response(cached, useJSON)
+
+            if cached:
+                conditional = httpcache.conditional_headers(cached)
+                config = {**config, "headers": {**config.get("headers", {}), **conditional}}
+
+            response = self._send(method, url, config, trace)
             Log.debug("[%s] %s%s", response.status_code, url, qs)
+            trace["status"] = response.status_code
+
+            if cached and response.status_code == 304:
+                cached = httpcache.revalidated(cache_key, cached, response.headers)
+                return self._cached_response(cached, useJSON)
 
-            data = response.json() if useJSON else response.text
+            if cache_key and httpcache.is_storable(response.status_code, response.headers):
+                httpcache.store_response(cache_key, response.content, response.headers)
 
-            return ApiResponse(
-                data=data,
-                status=response.status_code,
-                ok=200 <= response.status_code < 400,
+            return ApiResponse.from_body(
+                response.content, response.status_code, response.encoding, useJSON
             )
+        except CircuitOpenError as error:
+            Log.error("Error: %s", error)
+            trace["error"] = str(error)
+            return ApiResponse(data=str(error), status=503, ok=False)
         except Exception as error:
             Log.error("[%s] %s%s", 500, url, qs)
             Log.error("Error: %s", error)
+            trace["error"] = str(error)
             return ApiResponse(data=str(error), status=500, ok=False)
+
+    def _send(self, method: str, url: str, config: dict, trace: dict) -> requests.Response:
+        """Send a request, retrying idempotent ones on transient failures."""
+        host = urllib.parse.urlsplit(url).netloc
+        breaker = get_circuit_breaker(host, self.breaker_failures, self.breaker_reset_seconds)
+        limiter = get_host_limiter(host, self.rate_limit, self.rate_burst, self.max_concurrency)
+        retries = self.retries if method.upper() in HTTP_IDEMPOTENT_METHODS else 0
+        config = {"timeout": self.timeout, **config}
+
+        for attempt in range(retries + 1):
+            trace["attempts"] = attempt + 1
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit for {host} is open, not sending {method} {url}")
+
+            response = None
+            try:
+                if is_replaying():
+                    response = self._timed_request(method, url, config)
+                else:
+                    with limiter.slot() as waited:
+                        if waited >= 0.001:
+                            trace["throttled_ms"] = trace.get("throttled_ms", 0) + waited * 1000
+                        response = self._timed_request(method, url, config)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                breaker.record_failure()
+                if attempt == retries:
+                    raise
+                Log.warning("%s %s failed: %s", method, url, error)
+            except Exception:
+                breaker.record_failure()
+                raise
+            else:
+                # Rate limiting says nothing about the health of the host
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                elif response.status_code == 429:
+                    breaker.release_trial()
+                else:
+                    breaker.record_success()
+
+                if response.status_code not in HTTP_RETRY_STATUSES or attempt == retries:
+                    return response
+                Log.warning("[%s] %s", response.status_code, url)
+
+            delay = self._backoff_delay(attempt, response)
+            Log.warning("Retrying in %.1fs (attempt %d/%d)", delay, attempt + 2, retries + 1)
+            time.sleep(delay)
+
+    def _timed_request(self, method: str, url: str, config: dict) -> requests.Response:
+        """Send a single request, recording its latency, outcome and size in the metrics."""
+        parts = urllib.parse.urlsplit(url)
+        host, endpoint = parts.netloc, parts.path or "/"
+
+        started = time.perf_counter()
+        try:
+            response = self._session.request(method, url, **config)
+        except Exception:
+            record_request(host, endpoint, time.perf_counter() - started, ok=False)
+            raise
+
+        elapsed = time.perf_counter() - started
+        record_request(host, endpoint, elapsed, response.status_code < 400, len(response.content))
+        return response
+
+    def _backoff_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """Exponential backoff with full jitter, or the server's Retry-After if it's longer."""
+        delay = random.uniform(0, min(HTTP_BACKOFF_MAX_SECONDS, self.backoff_seconds * 2**attempt))
+
+        retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+        if retry_after.isdigit():
+            delay = max(delay, min(HTTP_BACKOFF_MAX_SECONDS, int(retry_after)))
+
+        return delay
+
+    @staticmethod
+    def _cached_response(cached: httpcache.CachedResponse, useJSON: bool) -> ApiResponse:
+        encoding = get_encoding_from_headers(cached.headers)
+        return ApiResponse.from_body(cached.body, 200, encoding, useJSON)
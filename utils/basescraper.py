@@ -21,7 +21,9 @@ class BaseScraper(BaseAPI):
         response = self.request("GET", endpoint, config, useJSON=False)
 
         if not response.ok:
-            return ""
+            raise RuntimeError(
+                f"Request for {self.base_url}{endpoint} failed with status {response.status}"
+            )
 
         # Parse HTML and extract CSS selector content
         soup = BeautifulSoup(response.data, "html.parser")
@@ -1,53 +1,312 @@
+import contextvars
+import hashlib
 import json
-from datetime import date
-from typing import Any, Optional
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
 
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from utils.cassette import is_cassette_active
+from utils.cachestore import CacheStore, LookupStats, get_cache_store
+from utils.constants import CACHE_MEMORY_MAX_ENTRIES
 from utils.logging import Log
-from utils.renderers import save_file
+
+# Cache keys currently being refreshed in the background.
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+# One lock per cache key, held while downloading data for it. Only weakly referenced,
+# so a key's lock goes away once no thread uses it, instead of piling up in a warm process.
+_key_locks: "weakref.WeakValueDictionary[str, threading.Lock]" = weakref.WeakValueDictionary()
+_key_locks_lock = threading.Lock()
+
+# Hit/miss counts not yet added to the stores' persisted totals.
+_lookups: Dict[CacheStore, LookupStats] = {}
+_lookups_lock = threading.Lock()
+
+# Parsed data of recently used entries, so rebuilds in a warm process (dev server,
+# scheduler) skip reading and validating stored data: {(store, key): (created_at, data)}
+_memory: "OrderedDict[Tuple[CacheStore, str], Tuple[float, Any]]" = OrderedDict()
+_memory_lookups = [0, 0]  # hits, misses
+_memory_lock = threading.Lock()
+
+
+def get_current_store() -> CacheStore:
+    """Get the cache store selected for the current runner execution."""
+    # Import here to avoid circular imports
+    from config import get_cli_context
+
+    context = get_cli_context()
+    return get_cache_store(context.cache_dir, context.cache_store)
+
+
+def is_cache_fresh(
+    cached_at: datetime,
+    now: datetime,
+    ttl: Optional[timedelta] = None,
+    prewarm: Optional[timedelta] = None,
+) -> bool:
+    """
+    Check whether data cached at `cached_at` is still fresh.
+
+    With a `ttl`, data expires that long after it was cached. Otherwise it expires at
+    midnight. With `prewarm`, data cached within that window before midnight already
+    counts for the next day, and older data goes stale once the window starts, so the
+    daily refetch happens before midnight instead of all at once after it.
+    """
+    if ttl is not None:
+        return now - cached_at < ttl
+
+    start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if not prewarm:
+        return cached_at >= start_of_day
+
+    warmup_start = start_of_day + timedelta(days=1) - prewarm
+    if now >= warmup_start:
+        return cached_at >= warmup_start
+
+    return cached_at >= start_of_day - prewarm
+
+
+def _get_key_lock(cache_key: str) -> threading.Lock:
+    with _key_locks_lock:
+        lock = _key_locks.get(cache_key)
+        if lock is None:
+            lock = _key_locks[cache_key] = threading.Lock()
+        return lock
+
+
+def _record_lookup(store: CacheStore, namespace: str, hit: bool):
+    with _lookups_lock:
+        counts = _lookups.setdefault(store, {}).setdefault(namespace, [0, 0])
+        counts[0 if hit else 1] += 1
+
+
+def _remember(store: CacheStore, cache_key: str, created_at: float, data: Any):
+    with _memory_lock:
+        _memory[(store, cache_key)] = (created_at, data)
+        _memory.move_to_end((store, cache_key))
+        while len(_memory) > CACHE_MEMORY_MAX_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def _recall(store: CacheStore, cache_key: str, created_at: float) -> Optional[Any]:
+    """Get parsed data from memory, if the stored entry hasn't been replaced since."""
+    with _memory_lock:
+        remembered = _memory.get((store, cache_key))
+        if remembered and remembered[0] == created_at:
+            _memory.move_to_end((store, cache_key))
+            _memory_lookups[0] += 1
+            return remembered[1]
+
+        _memory_lookups[1] += 1
+        return None
+
+
+def get_memory_stats() -> Tuple[int, int]:
+    """Get the hits and misses of the in-memory tier in this process."""
+    with _memory_lock:
+        return _memory_lookups[0], _memory_lookups[1]
+
+
+def flush_lookup_stats():
+    """Add the hit/miss counts of this process to the stores' persisted totals."""
+    with _lookups_lock:
+        pending = dict(_lookups)
+        _lookups.clear()
+
+    for store, stats in pending.items():
+        store.add_lookup_stats(stats)
+
+
+def _to_jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return str(value)
 
 
-def _read_json_from_file(cache_file: str) -> Optional[str]:
+def get_cache_key(namespace: str, key_source: Any) -> str:
+    """Build a cache key from a namespace and a stable hash of the given value."""
+    serialized = json.dumps(key_source, sort_keys=True, default=_to_jsonable)
+    digest = hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:16]
+    return f"{namespace}_{digest}"
+
+
+def _parse_cached_data(data: bytes, DataModel: Any):
+    """Validate raw JSON straight into the model, without an intermediate dict."""
+    if DataModel is bytes:
+        return data
+
     try:
-        with open(cache_file, "r") as f:
-            return json.load(f)
-    except Exception as e:
+        if isinstance(DataModel, type) and issubclass(DataModel, BaseModel):
+            return DataModel.model_validate_json(data)
+        else:
+            return TypeAdapter(DataModel).validate_json(data)
+    except ValidationError as e:
+        Log.warning("Ignoring invalid cached data: %s", e)
+        return None
+
+
+def _load_from_cache(store: CacheStore, cache_key: str, DataModel: Any):
+    entry = store.get(cache_key)
+    if not entry:
         return None
 
+    cached_data = _parse_cached_data(entry.data, DataModel)
+    if cached_data is not None:
+        _remember(store, cache_key, entry.created_at, cached_data)
+    return cached_data
+
+
+def _save_to_cache(store: CacheStore, cache_key: str, namespace: str, fresh_data: Any):
+    # Handle raw payloads, Pydantic models and plain strings/data
+    if isinstance(fresh_data, bytes):
+        cache_content = fresh_data
+    elif hasattr(fresh_data, "model_dump_json"):
+        cache_content = fresh_data.model_dump_json(by_alias=True).encode("utf-8")
+    else:
+        cache_content = json.dumps(fresh_data, separators=(",", ":")).encode("utf-8")
+
+    created_at = store.put(cache_key, namespace, cache_content)
+    _remember(store, cache_key, created_at, fresh_data)
+    Log.info("Cached data saved: %s", cache_key)
+
+
+def _refresh_in_background(
+    store: CacheStore, cache_key: str, namespace: str, function, *args, **kwargs
+):
+    """Redownload data in a background thread, at most once per cache key at a time."""
+    with _refreshing_lock:
+        if cache_key in _refreshing:
+            return
+        _refreshing.add(cache_key)
+
+    def refresh():
+        try:
+            with _get_key_lock(cache_key):
+                _save_to_cache(store, cache_key, namespace, function(*args, **kwargs))
+            Log.info("Background refresh done: %s", cache_key)
+        except Exception as e:
+            Log.warning("Background refresh of %s failed: %s", cache_key, e)
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(cache_key)
+
+    # Not a daemon thread: a CLI run waits for the refresh to land before exiting.
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(refresh,), name="cache-refresh").start()
+
+
+def cache_output(
+    namespace: str,
+    DataModel: Any,
+    ttl: Optional[timedelta] = None,
+    stale_while_revalidate: bool = False,
+    prewarm: Optional[timedelta] = None,
+    key: Optional[Callable[..., Any]] = None,
+):
+    """
+    Retrieves the given data from cache if it exists, else redownload and save to cache.
+
+    Entries are keyed by the namespace and a hash of the decorated function's arguments,
+    so calls with different parameters never share an entry. Recently used entries are
+    also kept in memory as parsed data, and reused for as long as the stored entry stays
+    the same, so the returned data must not be modified.
 
-def cache_output(namespace: str, DataModel: Any):
-    """Retrieves the given data from cache if it exists, else redownload and save to cache."""
+    If redownloading raises, the last cached data is returned instead, however old.
+
+    Args:
+        namespace: Cache namespace, prefix of the cache key
+        DataModel: Pydantic model (or `str`, `dict`) to parse cached data into, or `bytes`
+            to store raw payloads (e.g. `ApiResponse.raw`) as they are
+        ttl: How long data stays fresh. Default: until midnight
+        stale_while_revalidate: Serve stale data immediately and redownload in the background
+        prewarm: For daily data, redownload within this window before midnight already
+        key: Called with the function's arguments, returns the values that identify an entry.
+            Default: all arguments
+    """
 
     def decorator(function):
         def wrapper(*args, **kwargs):
             # Import here to avoid circular imports
-            from config import get_cache_dir, should_ignore_cache
+            from config import should_ignore_cache
+
+            # Recorded and replayed builds must reach the upstream APIs every time.
+            if is_cassette_active():
+                return function(*args, **kwargs)
+
+            key_source = key(*args, **kwargs) if key else [args, kwargs]
+            cache_key = get_cache_key(namespace, key_source)
+            store = get_current_store()
+
+            ignore_cache = should_ignore_cache()
+            started_at = time.time()
 
-            today = date.today().strftime("%Y-%m-%d")
-            cache_dir = get_cache_dir()
-            cache_file = f"{cache_dir}/{today}_{namespace}.json"
+            def lookup(since: Optional[float] = None):
+                """Get usable cached data, optionally only if it was stored after `since`."""
+                created_at = store.stamp(cache_key)
+                if created_at is None or (since is not None and created_at < since):
+                    return None
+
+                cached_at = datetime.fromtimestamp(created_at)
+                fresh = is_cache_fresh(cached_at, datetime.now(), ttl, prewarm)
+
+                cached_data = None
+                if fresh or stale_while_revalidate:
+                    cached_data = _recall(store, cache_key, created_at)
+                    if cached_data is None:
+                        cached_data = _load_from_cache(store, cache_key, DataModel)
+
+                if cached_data and fresh:
+                    Log.info("Cached data found! Proceeding offline.")
+                    return cached_data
+
+                if cached_data:
+                    Log.info("Stale cached data found, refreshing in the background.")
+                    _refresh_in_background(store, cache_key, namespace, function, *args, **kwargs)
+                    return cached_data
+
+                return None
 
             # Check if cache should be ignored
-            if should_ignore_cache():
+            if ignore_cache:
                 Log.info("Ignoring cache, forcing redownload...")
             else:
-                cached_data = _read_json_from_file(cache_file)
+                cached_data = lookup()
                 if cached_data:
-                    Log.info("Cached data found! Proceeding offline.")
-                    if DataModel == str:
-                        return cached_data
-                    else:
-                        return DataModel(**cached_data)
+                    _record_lookup(store, namespace, hit=True)
+                    return cached_data
 
-            Log.info("Missing cache, redownloading...")
-            fresh_data = function(*args, **kwargs)
+            # Concurrent callers of the same key wait here for a single download, then
+            # find its result in the cache. When ignoring the cache, only data downloaded
+            # during this call counts.
+            with _get_key_lock(cache_key):
+                cached_data = lookup(since=started_at if ignore_cache else None)
+                if cached_data:
+                    _record_lookup(store, namespace, hit=True)
+                    return cached_data
 
-            # Handle both Pydantic models and plain strings/data
-            if hasattr(fresh_data, "model_dump_json"):
-                cache_content = fresh_data.model_dump_json(indent=2, by_alias=True)
-            else:
-                cache_content = json.dumps(fresh_data, indent=2)
+                if not ignore_cache:
+                    _record_lookup(store, namespace, hit=False)
+
+                Log.info("Missing or stale cache, redownloading...")
+                try:
+                    fresh_data = function(*args, **kwargs)
+                except Exception as e:
+                    # Keep pages up with the last good data while the upstream is down.
+                    fallback = _load_from_cache(store, cache_key, DataModel)
+                    if not fallback:
+                        raise
+                    Log.warning("Redownload failed, using last cached data instead: %s", e)
+                    return fallback
 
-            save_file(cache_file, cache_content)
+                _save_to_cache(store, cache_key, namespace, fresh_data)
 
             # Return new data and continue with the pipeline as usual
             return fresh_data
@@ -0,0 +1,182 @@
+"""
+Keeps the cache within its size and age budget, and reports how well it's doing.
+
+Used by `python main.py cache stats|prune`, and automatically after each build.
+"""
+
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from utils.cache import flush_lookup_stats, get_current_store, get_memory_stats
+from utils.cachestore import CacheEntry, CacheStore
+from utils.constants import DEFAULT_CACHE_MAX_AGE_DAYS, DEFAULT_CACHE_MAX_MB
+from utils.logging import Log
+
+DAY_SECONDS = 24 * 60 * 60
+
+# Files of the old cache layout, `{date}_{namespace}.json`, which nothing reads anymore.
+LEGACY_CACHE_FILE = re.compile(r"\d{4}-\d{2}-\d{2}_.+\.json")
+
+
+@dataclass
+class NamespaceStats:
+    entries: int = 0
+    bytes: int = 0
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass
+class CacheStats:
+    namespaces: Dict[str, NamespaceStats] = field(default_factory=dict)
+    oldest: List[CacheEntry] = field(default_factory=list)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(stats.bytes for stats in self.namespaces.values())
+
+
+def get_cache_stats(store: CacheStore, oldest_count: int = 5) -> CacheStats:
+    """Collect entry counts, sizes and hit ratios per namespace, and the oldest entries."""
+    flush_lookup_stats()
+
+    stats = CacheStats()
+    entries = list(store.entries())
+
+    for entry in entries:
+        namespace = stats.namespaces.setdefault(entry.namespace, NamespaceStats())
+        namespace.entries += 1
+        namespace.bytes += entry.size
+
+    for name, (hits, misses) in store.lookup_stats().items():
+        namespace = stats.namespaces.setdefault(name, NamespaceStats())
+        namespace.hits = hits
+        namespace.misses = misses
+
+    stats.oldest = sorted(entries, key=lambda entry: entry.created_at)[:oldest_count]
+    return stats
+
+
+def prune_cache(
+    store: CacheStore,
+    max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024,
+    max_age_days: float = DEFAULT_CACHE_MAX_AGE_DAYS,
+) -> Tuple[int, int]:
+    """
+    Delete entries older than `max_age_days`, then least recently used entries until the
+    cache fits in `max_bytes`.
+
+    Returns:
+        Number of deleted entries and the bytes they took
+    """
+    oldest_allowed = time.time() - max_age_days * DAY_SECONDS
+    entries = list(store.entries())
+    expired = [entry for entry in entries if entry.created_at < oldest_allowed]
+    kept = [entry for entry in entries if entry.created_at >= oldest_allowed]
+
+    # Least recently used first
+    kept.sort(key=lambda entry: entry.accessed_at)
+    kept_bytes = sum(entry.size for entry in kept)
+    while kept and kept_bytes > max_bytes:
+        kept_bytes -= kept[0].size
+        expired.append(kept.pop(0))
+
+    removed_count = removed_bytes = 0
+    for entry in expired:
+        store.delete(entry.key)
+        removed_count += 1
+        removed_bytes += entry.size
+
+    if removed_count:
+        store.compact()
+        Log.info(f"Pruned {removed_count} cache entries, freed {_format_bytes(removed_bytes)}")
+
+    return removed_count, removed_bytes
+
+
+def remove_legacy_cache_files(cache_dir: str) -> Tuple[int, int]:
+    """
+    Delete cache files left over from the old `{date}_{namespace}.json` layout.
+
+    Returns:
+        Number of deleted files and the bytes they took
+    """
+    if not os.path.isdir(cache_dir):
+        return 0, 0
+
+    removed_count = removed_bytes = 0
+    for filename in os.listdir(cache_dir):
+        if not LEGACY_CACHE_FILE.fullmatch(filename):
+            continue
+
+        path = os.path.join(cache_dir, filename)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            continue
+        removed_count += 1
+        removed_bytes += size
+
+    if removed_count:
+        Log.info(
+            f"Removed {removed_count} legacy cache files, freed {_format_bytes(removed_bytes)}"
+        )
+
+    return removed_count, removed_bytes
+
+
+def maintain_cache():
+    """Persist lookup counts and enforce the default budget on the current cache store."""
+    hits, misses = get_memory_stats()
+    if hits or misses:
+        Log.info(f"In-memory cache: {hits} hits, {misses} misses")
+
+    # Import here to avoid circular imports
+    from config import get_cache_dir
+
+    try:
+        flush_lookup_stats()
+        remove_legacy_cache_files(get_cache_dir())
+        prune_cache(get_current_store())
+    except Exception as e:
+        # Never fail a build over cache housekeeping
+        Log.warning(f"Cache maintenance failed: {e}")
+
+
+def format_cache_stats(stats: CacheStats) -> str:
+    lines = [
+        f"{'Namespace':<24} {'Entries':>8} {'Size':>10} {'Hits':>8} {'Misses':>8} {'Ratio':>6}"
+    ]
+    for name, namespace in sorted(stats.namespaces.items()):
+        lines.append(
+            f"{name:<24} {namespace.entries:>8} {_format_bytes(namespace.bytes):>10}"
+            f" {namespace.hits:>8} {namespace.misses:>8} {namespace.hit_ratio:>6.0%}"
+        )
+    lines.append(f"Total size: {_format_bytes(stats.total_bytes)}")
+
+    if stats.oldest:
+        lines.append("")
+        lines.append("Oldest entries:")
+        now = time.time()
+        for entry in stats.oldest:
+            age_days = (now - entry.created_at) / DAY_SECONDS
+            lines.append(f"  {entry.key:<40} {age_days:>6.1f} days {_format_bytes(entry.size):>10}")
+
+    return "\n".join(lines)
+
+
+def _format_bytes(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
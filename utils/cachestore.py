@@ -0,0 +1,326 @@
+"""
+Storage engines for cached data.
+
+Entries are raw (optionally compressed) JSON bytes, so readers can validate them
+straight into pydantic models without building intermediate dicts.
+"""
+
+import gzip
+import json
+from abc import ABC, abstractmethod
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils.constants import (
+    CACHE_COMPRESS_MIN_BYTES,
+    CACHE_SQLITE_FILE,
+    CACHE_SQLITE_MMAP_BYTES,
+    CACHE_STATS_FILE,
+)
+from utils.paths import write_atomic
+
+try:
+    import zstandard
+except ImportError:  # Optional, gzip is always available
+    zstandard = None
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    namespace: str
+    created_at: float  # UNIX timestamp
+    accessed_at: float  # UNIX timestamp of the last read, for LRU eviction
+    size: int  # Stored (compressed) size in bytes
+    data: Optional[bytes] = None  # Uncompressed JSON, not loaded when listing entries
+
+
+# Lookup counters per namespace: {namespace: [hits, misses]}
+LookupStats = Dict[str, List[int]]
+
+
+def _compress(data: bytes) -> Tuple[str, bytes]:
+    """Compress data with the best available codec. Small payloads are kept as is."""
+    if len(data) < CACHE_COMPRESS_MIN_BYTES:
+        return "raw", data
+    if zstandard:
+        return "zstd", zstandard.ZstdCompressor(level=3).compress(data)
+    return "gzip", gzip.compress(data, compresslevel=5)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if not zstandard:
+            raise ValueError("Cache entry is zstd compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    return data
+
+
+class CacheStore(ABC):
+    """Interface of a cache storage engine."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry with its data, or None if it does not exist."""
+
+    @abstractmethod
+    def put(self, key: str, namespace: str, data: bytes) -> float:
+        """Store data under the key, replacing any previous entry. Returns its created_at."""
+
+    @abstractmethod
+    def stamp(self, key: str) -> Optional[float]:
+        """Get the created_at of an entry without loading it, or None if it does not exist."""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Delete an entry, if it exists."""
+
+    @abstractmethod
+    def entries(self) -> Iterator[CacheEntry]:
+        """List all entries without their data."""
+
+    @abstractmethod
+    def add_lookup_stats(self, stats: LookupStats):
+        """Add hit/miss counts to the persisted totals."""
+
+    @abstractmethod
+    def lookup_stats(self) -> LookupStats:
+        """Get the persisted hit/miss totals."""
+
+    def compact(self):
+        """Reclaim space freed by deleted entries."""
+
+
+class SQLiteCacheStore(CacheStore):
+    """All entries in a single SQLite database, read through a memory map."""
+
+    def __init__(self, cache_dir: str):
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        self.path = os.path.join(cache_dir, CACHE_SQLITE_FILE)
+        self._local = threading.local()
+
+        connection = self._connection()
+        connection.execute("""CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL DEFAULT 0,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            )""")
+        connection.execute("""CREATE TABLE IF NOT EXISTS lookups (
+                namespace TEXT PRIMARY KEY,
+                hits INTEGER NOT NULL,
+                misses INTEGER NOT NULL
+            )""")
+
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(entries)")]
+        if "accessed_at" not in columns:
+            connection.execute("ALTER TABLE entries ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections can't be shared between threads, so keep one per thread.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            # Only takes effect on new databases, lets compact() shrink the file.
+            connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA mmap_size={CACHE_SQLITE_MMAP_BYTES}")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT namespace, created_at, codec, size, data FROM entries WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if not row:
+            return None
+
+        accessed_at = time.time()
+        connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (accessed_at, key))
+
+        namespace, created_at, codec, size, data = row
+        return CacheEntry(key, namespace, created_at, accessed_at, size, _decompress(codec, data))
+
+    def put(self, key: str, namespace: str, data: bytes) -> float:
+        codec, stored = _compress(data)
+        now = time.time()
+        self._connection().execute(
+            "INSERT OR REPLACE INTO entries"
+            " (key, namespace, created_at, accessed_at, codec, size, data)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, namespace, now, now, codec, len(stored), stored),
+        )
+        return now
+
+    def stamp(self, key: str) -> Optional[float]:
+        connection = self._connection()
+        row = connection.execute("SELECT created_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+
+        connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def delete(self, key: str):
+        self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def entries(self) -> Iterator[CacheEntry]:
+        rows = self._connection().execute(
+            "SELECT key, namespace, created_at, accessed_at, size FROM entries"
+        )
+        for key, namespace, created_at, accessed_at, size in rows.fetchall():
+            yield CacheEntry(key, namespace, created_at, accessed_at, size)
+
+    def add_lookup_stats(self, stats: LookupStats):
+        connection = self._connection()
+        for namespace, (hits, misses) in stats.items():
+            connection.execute(
+                "INSERT INTO lookups (namespace, hits, misses) VALUES (?, ?, ?)"
+                " ON CONFLICT(namespace) DO UPDATE"
+                " SET hits = hits + excluded.hits, misses = misses + excluded.misses",
+                (namespace, hits, misses),
+            )
+
+    def lookup_stats(self) -> LookupStats:
+        rows = self._connection().execute("SELECT namespace, hits, misses FROM lookups")
+        return {namespace: [hits, misses] for namespace, hits, misses in rows.fetchall()}
+
+    def compact(self):
+        self._connection().execute("PRAGMA incremental_vacuum")
+
+
+class FileCacheStore(CacheStore):
+    """One compact JSON file per entry, named `{key}.json`, optionally compressed."""
+
+    EXTENSIONS = {".json": "raw", ".json.gz": "gzip", ".json.zst": "zstd"}
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self._stats_lock = threading.Lock()
+
+    def _find(self, key: str) -> Optional[Tuple[str, str]]:
+        for extension, codec in self.EXTENSIONS.items():
+            path = os.path.join(self.cache_dir, key + extension)
+            if os.path.exists(path):
+                return path, codec
+        return None
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        found = self._find(key)
+        if not found:
+            return None
+
+        path, codec = found
+        try:
+            with open(path, "rb") as file:
+                stored = file.read()
+            created_at = os.path.getmtime(path)
+            # Record the read in atime explicitly, regardless of mount options.
+            accessed_at = time.time()
+            os.utime(path, (accessed_at, created_at))
+        except OSError:
+            return None
+
+        namespace = key.rsplit("_", 1)[0]
+        return CacheEntry(
+            key, namespace, created_at, accessed_at, len(stored), _decompress(codec, stored)
+        )
+
+    def put(self, key: str, namespace: str, data: bytes) -> float:
+        codec, stored = _compress(data)
+        extension = next(ext for ext, ext_codec in self.EXTENSIONS.items() if ext_codec == codec)
+        path = os.path.join(self.cache_dir, key + extension)
+
+        write_atomic(path, stored)
+        # Drop the entry's previous file if it was stored with another codec.
+        for other in self.EXTENSIONS:
+            if other != extension:
+                self._remove(key + other)
+        return os.path.getmtime(path)
+
+    def stamp(self, key: str) -> Optional[float]:
+        found = self._find(key)
+        if not found:
+            return None
+
+        path, _ = found
+        try:
+            created_at = os.path.getmtime(path)
+            os.utime(path, (time.time(), created_at))
+        except OSError:
+            return None
+        return created_at
+
+    def _remove(self, filename: str):
+        try:
+            os.remove(os.path.join(self.cache_dir, filename))
+        except FileNotFoundError:
+            pass
+
+    def delete(self, key: str):
+        for extension in self.EXTENSIONS:
+            self._remove(key + extension)
+
+    def entries(self) -> Iterator[CacheEntry]:
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        for filename in os.listdir(self.cache_dir):
+            for extension in self.EXTENSIONS:
+                if filename.endswith(extension):
+                    key = filename[: -len(extension)]
+                    path = os.path.join(self.cache_dir, filename)
+                    stat = os.stat(path)
+                    namespace = key.rsplit("_", 1)[0]
+                    yield CacheEntry(key, namespace, stat.st_mtime, stat.st_atime, stat.st_size)
+                    break
+
+    def _stats_path(self) -> str:
+        return os.path.join(self.cache_dir, CACHE_STATS_FILE)
+
+    def add_lookup_stats(self, stats: LookupStats):
+        with self._stats_lock:
+            totals = self.lookup_stats()
+            for namespace, (hits, misses) in stats.items():
+                total = totals.setdefault(namespace, [0, 0])
+                total[0] += hits
+                total[1] += misses
+
+            write_atomic(self._stats_path(), json.dumps(totals).encode("utf-8"))
+
+    def lookup_stats(self) -> LookupStats:
+        try:
+            with open(self._stats_path(), "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+
+CACHE_STORES = {
+    "sqlite": SQLiteCacheStore,
+    "files": FileCacheStore,
+}
+
+_stores: Dict[Tuple[str, str], CacheStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_cache_store(cache_dir: str, kind: str) -> CacheStore:
+    """Get the (shared) store of the given kind for a cache directory."""
+    with _stores_lock:
+        if (cache_dir, kind) not in _stores:
+            _stores[(cache_dir, kind)] = CACHE_STORES[kind](cache_dir)
+        return _stores[(cache_dir, kind)]
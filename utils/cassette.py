@@ -0,0 +1,170 @@
+"""
+Record and replay of upstream HTTP traffic.
+
+With recording on, every response is saved as a JSON fixture (status, headers, body).
+With replay on, requests are answered from those fixtures without touching the network,
+so the transform and render stages of a build can be profiled offline and repeatably.
+
+Both modes also bypass `cache_output` and the HTTP cache, so every build runs the full
+fetch path. Enable a mode before creating any API clients.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from utils.constants import CASSETTE_IGNORED_PARAMS
+from utils.logging import Log
+from utils.paths import write_atomic
+
+# Headers that describe the transfer rather than the stored, decoded body
+_TRANSFER_HEADERS = ("content-encoding", "content-length", "transfer-encoding", "connection")
+
+_mode: Optional[str] = None  # "record" or "replay"
+_directory = ""
+_latency_seconds = 0.0
+
+# How many times each request has been made, so repeated requests replay in order.
+_counts: Dict[str, int] = {}
+_counts_lock = threading.Lock()
+
+
+class CassetteMissError(requests.RequestException):
+    """Raised when replaying a request that was never recorded."""
+
+
+def enable_recording(directory: str):
+    """Save every upstream response into `directory`."""
+    global _mode, _directory
+    _mode, _directory = "record", directory
+    Path(directory).mkdir(parents=True, exist_ok=True)
+
+
+def enable_replay(directory: str, latency_ms: float = 0):
+    """Answer requests from the responses recorded in `directory`, after `latency_ms`."""
+    global _mode, _directory, _latency_seconds
+    _mode, _directory, _latency_seconds = "replay", directory, latency_ms / 1000
+
+
+def is_cassette_active() -> bool:
+    return _mode is not None
+
+
+def is_replaying() -> bool:
+    return _mode == "replay"
+
+
+def _request_key(request: requests.PreparedRequest) -> str:
+    # Cache-busting parameters change on every run, leave them out.
+    url = urllib.parse.urlsplit(request.url)
+    query = [
+        (name, value)
+        for name, value in urllib.parse.parse_qsl(url.query, keep_blank_values=True)
+        if name not in CASSETTE_IGNORED_PARAMS
+    ]
+    normalized = url._replace(query=urllib.parse.urlencode(sorted(query))).geturl()
+
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+
+    digest = hashlib.sha256(request.method.encode() + b" " + normalized.encode() + b"\n" + body)
+    return f"{url.hostname}_{digest.hexdigest()[:16]}"
+
+
+def _fixture_path(key: str, number: int) -> str:
+    return os.path.join(_directory, f"{key}_{number:03d}.json")
+
+
+def _next_number(key: str) -> int:
+    with _counts_lock:
+        number = _counts.get(key, 0)
+        _counts[key] = number + 1
+        return number
+
+
+def _record(request: requests.PreparedRequest, response: requests.Response):
+    key = _request_key(request)
+    headers = {
+        name: value
+        for name, value in response.headers.items()
+        if name.lower() not in _TRANSFER_HEADERS
+    }
+    fixture = {
+        "method": request.method,
+        "url": request.url,
+        "status": response.status_code,
+        "reason": response.reason,
+        "headers": headers,
+    }
+    try:
+        fixture["body"] = response.content.decode("utf-8")
+    except UnicodeDecodeError:
+        fixture["body_base64"] = base64.b64encode(response.content).decode("ascii")
+
+    path = _fixture_path(key, _next_number(key))
+    write_atomic(path, json.dumps(fixture, ensure_ascii=False, indent=2).encode("utf-8"))
+    Log.debug("Recorded %s %s to %s", request.method, request.url, path)
+
+
+def _replay(request: requests.PreparedRequest) -> requests.Response:
+    key = _request_key(request)
+    number = _next_number(key)
+
+    # Requests made more often than recorded get the last recorded response.
+    while number > 0 and not os.path.exists(_fixture_path(key, number)):
+        number -= 1
+
+    path = _fixture_path(key, number)
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            fixture = json.load(file)
+    except FileNotFoundError:
+        raise CassetteMissError(f"No recorded response for {request.method} {request.url}")
+
+    if _latency_seconds:
+        time.sleep(_latency_seconds)
+
+    response = requests.Response()
+    response.status_code = fixture["status"]
+    response.reason = fixture.get("reason", "")
+    response.headers = CaseInsensitiveDict(fixture["headers"])
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = request.url
+    response.request = request
+    if "body_base64" in fixture:
+        response._content = base64.b64decode(fixture["body_base64"])
+    else:
+        response._content = fixture["body"].encode("utf-8")
+    return response
+
+
+class CassetteAdapter(BaseAdapter):
+    """Transport adapter that records the responses of another adapter, or replays them."""
+
+    def __init__(self, adapter: BaseAdapter):
+        super().__init__()
+        self.adapter = adapter
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if _mode == "replay":
+            return _replay(request)
+
+        response = self.adapter.send(request, **kwargs)
+        if _mode == "record":
+            _record(request, response)
+        return response
+
+    def close(self):
+        self.adapter.close()
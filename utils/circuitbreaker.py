@@ -0,0 +1,82 @@
+"""Per-host circuit breakers, so a failing upstream fails fast instead of stalling builds."""
+
+import threading
+import time
+from typing import Dict
+
+from utils.logging import Log
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive failed requests to a host. While open, requests
+    fail immediately. After `reset_seconds` a single trial request is let through:
+    success closes the circuit again, failure keeps it open for another period.
+    """
+
+    def __init__(self, host: str, failures: int, reset_seconds: float):
+        self.host = host
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+
+        self._lock = threading.Lock()
+        self._failure_count = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    def allow(self) -> bool:
+        """Check whether a request may be sent now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+
+            if self._trial_running or time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                Log.info(f"Circuit for {self.host} closed again")
+            self._failure_count = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failure_count += 1
+            if self._trial_running or (
+                self._opened_at is None and self._failure_count >= self.failures
+            ):
+                Log.warning(
+                    f"Circuit for {self.host} opened after {self._failure_count} failures, "
+                    f"failing fast for {self.reset_seconds:g}s"
+                )
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def release_trial(self):
+        """
+        Record a response that says nothing about the host's health, e.g. rate limiting.
+        The circuit stays as it is, and a later request may be the trial instead.
+        """
+        with self._lock:
+            self._trial_running = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(host: str, failures: int, reset_seconds: float) -> CircuitBreaker:
+    """Get the process-wide breaker of a host, created with the given settings on first use."""
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host, failures, reset_seconds)
+        return _breakers[host]
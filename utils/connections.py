@@ -0,0 +1,92 @@
+"""Process-wide HTTP connection pooling shared by all API clients."""
+
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.cassette import CassetteAdapter, is_cassette_active
+from utils.constants import (
+    DEFAULT_HTTP_POOL_HOSTS,
+    DEFAULT_HTTP_POOL_SIZE,
+    DEFAULT_HTTP_KEEP_ALIVE,
+)
+
+
+class SharedPoolAdapter(HTTPAdapter):
+    """HTTP adapter shared between sessions. Its urllib3 pool manager keeps one
+    connection pool per host, so every client talking to the same host reuses
+    the same warm TCP/TLS connections."""
+
+    def close(self):
+        # Sessions must not tear down pools that other sessions still use.
+        # See `close_connection_pools()` for really closing them.
+        pass
+
+
+_lock = threading.Lock()
+_adapter: Optional[SharedPoolAdapter] = None
+_keep_alive = DEFAULT_HTTP_KEEP_ALIVE
+
+
+def configure_connection_pools(
+    max_hosts: int = DEFAULT_HTTP_POOL_HOSTS,
+    pool_size: int = DEFAULT_HTTP_POOL_SIZE,
+    keep_alive: bool = DEFAULT_HTTP_KEEP_ALIVE,
+):
+    """
+    Configure the shared connection pools. Affects sessions created after the call.
+
+    Args:
+        max_hosts: Number of per-host pools kept open at once
+        pool_size: Maximum number of reusable connections per host
+        keep_alive: Keep connections open between requests
+    """
+    global _adapter, _keep_alive
+
+    with _lock:
+        if _adapter:
+            HTTPAdapter.close(_adapter)
+
+        _adapter = SharedPoolAdapter(pool_connections=max_hosts, pool_maxsize=pool_size)
+        _keep_alive = keep_alive
+
+
+def get_shared_adapter() -> SharedPoolAdapter:
+    """Get the process-wide HTTP adapter, creating it with default settings if needed."""
+    global _adapter
+
+    if _adapter is None:
+        with _lock:
+            # Another thread may have created it while this one waited for the lock.
+            if _adapter is None:
+                _adapter = SharedPoolAdapter(
+                    pool_connections=DEFAULT_HTTP_POOL_HOSTS, pool_maxsize=DEFAULT_HTTP_POOL_SIZE
+                )
+
+    return _adapter
+
+
+def create_session() -> requests.Session:
+    """Create a session with its own headers and cookies, backed by the shared pools."""
+    session = requests.Session()
+
+    adapter = get_shared_adapter()
+    if is_cassette_active():
+        adapter = CassetteAdapter(adapter)
+
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    if not _keep_alive:
+        session.headers["Connection"] = "close"
+
+    return session
+
+
+def close_connection_pools():
+    """Close all pooled connections, e.g. on shutdown."""
+    with _lock:
+        if _adapter:
+            HTTPAdapter.close(_adapter)
@@ -5,10 +5,47 @@ DEFAULT_OUTPUT_DIR = "_out"
 DEFAULT_CACHE_DIR = "_cache"
 DEFAULT_CONFIG_DIR = "_confs"
 
+# Cache storage settings
+DEFAULT_CACHE_STORE = "sqlite"  # See utils.cachestore.CACHE_STORES
+CACHE_SQLITE_FILE = "cache.sqlite3"
+CACHE_SQLITE_MMAP_BYTES = 256 * 1024 * 1024
+CACHE_COMPRESS_MIN_BYTES = 1024  # Smaller entries are stored uncompressed
+CACHE_STATS_FILE = "lookups.stats"  # Hit/miss totals of the file store
+CACHE_MEMORY_MAX_ENTRIES = 64  # Parsed entries kept in memory between rebuilds
+
+# Cache budget, enforced after each build
+DEFAULT_CACHE_MAX_MB = 200
+DEFAULT_CACHE_MAX_AGE_DAYS = 14
+
+# HTTP client settings
+DEFAULT_ASYNC_HTTP_WORKERS = 16
+DEFAULT_HTTP_POOL_HOSTS = 32  # Per-host connection pools kept open at once
+DEFAULT_HTTP_POOL_SIZE = 10  # Reusable connections per host
+DEFAULT_HTTP_KEEP_ALIVE = True
+DEFAULT_HTTP_TIMEOUT_SECONDS = 20
+DEFAULT_HTTP_RETRIES = 2  # Extra attempts of idempotent requests after transient failures
+DEFAULT_HTTP_BACKOFF_SECONDS = 0.5  # Doubled for every retry, with full jitter
+HTTP_BACKOFF_MAX_SECONDS = 10
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+HTTP_IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+DEFAULT_CIRCUIT_BREAKER_FAILURES = 5  # Consecutive failures before a host fails fast
+DEFAULT_CIRCUIT_BREAKER_RESET_SECONDS = 60
+DEFAULT_HTTP_RATE_PER_SECOND = 5.0  # Requests per host, on average
+DEFAULT_HTTP_RATE_BURST = 5  # Requests per host sent back-to-back before the rate applies
+DEFAULT_HTTP_MAX_CONCURRENCY = 4  # Requests per host in flight at once
+METRICS_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)  # Seconds
+METRICS_MAX_SAMPLES = 4096  # Latest latencies kept per endpoint for quantiles
+CASSETTE_IGNORED_PARAMS = ("_",)  # Cache-busting query parameters, see utils.cassette
+
 # Development server settings
 DEFAULT_DEV_PORT = 8000
 DEFAULT_DEV_HOST = "localhost"
 
+# Scheduler settings
+DEFAULT_SCHEDULE_MINUTES = [0]  # Minutes past the hour for runners without refresh hints
+DEFAULT_SCHEDULER_LEAD_SECONDS = 60  # How long before a page refresh to execute its runner
+SCHEDULER_MAX_SLEEP_SECONDS = 60
+
 # File watcher settings
 DEFAULT_DEBOUNCE_DELAY = 2.0
 
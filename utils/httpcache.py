@@ -0,0 +1,138 @@
+"""
+Private HTTP cache for `BaseAPI`, below the app-level `cache_output`.
+
+Bodies of GET responses are stored with their validators (ETag, Last-Modified) in the
+cache store, under the `http` namespace. Responses stay fresh for as long as their
+`Cache-Control: max-age` or `Expires` allows; after that the next request is
+conditional, and a `304 Not Modified` is answered from the stored body.
+
+An entry is a line of JSON metadata followed by the raw body bytes, so bodies are
+stored and served without decoding them.
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from utils.cache import get_cache_key, get_current_store
+from utils.logging import Log
+
+HTTP_CACHE_NAMESPACE = "http"
+
+# Response headers kept with the body, and updated from 304 responses.
+STORED_HEADERS = ("etag", "last-modified", "cache-control", "expires", "date", "content-type")
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    stored_at: float  # UNIX timestamp of the last download or revalidation
+    headers: Dict[str, str] = field(default_factory=dict)  # Lowercase names
+
+
+def get_http_cache_key(url: str, params: Any, headers: Dict[str, str]) -> str:
+    """Key a response by URL, query parameters and the request headers it may vary on."""
+    vary = {name.lower(): value for name, value in headers.items()}
+    return get_cache_key(
+        HTTP_CACHE_NAMESPACE,
+        [url, params, vary.get("accept"), vary.get("accept-language")],
+    )
+
+
+def _cache_directives(headers: Dict[str, str]) -> Dict[str, Optional[str]]:
+    directives = {}
+    for directive in headers.get("cache-control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+def is_storable(status: int, headers: Dict[str, str]) -> bool:
+    """Only complete responses that allow storing, and can be reused or revalidated."""
+    if status != 200:
+        return False
+
+    directives = _cache_directives(headers)
+    if "no-store" in directives:
+        return False
+
+    return bool(
+        "etag" in headers
+        or "last-modified" in headers
+        or _freshness_lifetime(headers, directives) > 0
+    )
+
+
+def _freshness_lifetime(headers: Dict[str, str], directives: Dict[str, Optional[str]]) -> float:
+    if "no-cache" in directives:
+        return 0
+
+    if directives.get("max-age"):
+        try:
+            return max(0, int(directives["max-age"]))
+        except ValueError:
+            return 0
+
+    if "expires" in headers:
+        try:
+            expires = parsedate_to_datetime(headers["expires"]).timestamp()
+            date = parsedate_to_datetime(headers["date"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return 0
+        return max(0, expires - date)
+
+    return 0
+
+
+def is_fresh(cached: CachedResponse, now: Optional[float] = None) -> bool:
+    """Check whether a stored response can be used without contacting the server."""
+    now = time.time() if now is None else now
+    lifetime = _freshness_lifetime(cached.headers, _cache_directives(cached.headers))
+    return now - cached.stored_at < lifetime
+
+
+def conditional_headers(cached: CachedResponse) -> Dict[str, str]:
+    """Request headers that let the server answer 304 if the stored response is current."""
+    headers = {}
+    if "etag" in cached.headers:
+        headers["If-None-Match"] = cached.headers["etag"]
+    if "last-modified" in cached.headers:
+        headers["If-Modified-Since"] = cached.headers["last-modified"]
+    return headers
+
+
+def load_response(cache_key: str) -> Optional[CachedResponse]:
+    entry = get_current_store().get(cache_key)
+    if not entry:
+        return None
+
+    meta, separator, body = entry.data.partition(b"\n")
+    try:
+        if not separator:
+            raise ValueError("no body")
+        meta = json.loads(meta)
+        return CachedResponse(body=body, stored_at=meta["stored_at"], headers=meta["headers"])
+    except (KeyError, TypeError, ValueError) as e:
+        Log.warning("Ignoring invalid HTTP cache entry %s: %s", cache_key, e)
+        return None
+
+
+def store_response(cache_key: str, body: bytes, headers: Dict[str, str]) -> CachedResponse:
+    cached = CachedResponse(
+        body=body,
+        stored_at=time.time(),
+        headers={name: headers[name] for name in STORED_HEADERS if name in headers},
+    )
+    meta = json.dumps({"stored_at": cached.stored_at, "headers": cached.headers})
+    get_current_store().put(cache_key, HTTP_CACHE_NAMESPACE, meta.encode("utf-8") + b"\n" + body)
+    return cached
+
+
+def revalidated(cache_key: str, cached: CachedResponse, headers: Dict[str, str]) -> CachedResponse:
+    """Store a response again after a 304, with the headers the server sent along."""
+    updated = {**cached.headers}
+    updated.update({name: headers[name] for name in STORED_HEADERS if name in headers})
+    return store_response(cache_key, cached.body, updated)
@@ -0,0 +1,85 @@
+"""
+Cold-start benchmark for the CLI.
+
+Imports `main` and lists the runners in fresh interpreters, the same work
+`python main.py runners` does, and fails if that gets slower than the budget or
+pulls in any of the heavy modules that only runners should need.
+
+    python -m utils.importbench [--budget-ms 150] [--rounds 5]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Modules that must stay out of the CLI's cold start.
+HEAVY_MODULES = (
+    "pydantic",
+    "requests",
+    "jinja2",
+    "bs4",
+    "skyfield",
+    "watchdog",
+    "auki.runners",
+    "swimmi.runners",
+    "tori.runners",
+    "leffa.runners",
+    "koje.runners",
+    "saa.runners",
+    "uutta.runners",
+)
+
+DEFAULT_BUDGET_MS = 150
+DEFAULT_ROUNDS = 5
+
+_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import main
+from config import list_runners
+list_runners()
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "modules": sorted(sys.modules)}))
+"""
+
+
+def measure_cold_start() -> dict:
+    """Measure one cold start in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", _SNIPPET], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Guard the CLI cold-start time")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    args = parser.parse_args()
+
+    results = [measure_cold_start() for _ in range(args.rounds)]
+    median_ms = statistics.median(result["ms"] for result in results)
+    heavy = sorted(set(HEAVY_MODULES) & set(results[0]["modules"]))
+
+    print(f"CLI cold start: median {median_ms:.1f} ms over {args.rounds} rounds")
+    print(f"Budget: {args.budget_ms:.0f} ms")
+
+    ok = True
+    if median_ms > args.budget_ms:
+        print("FAIL: cold start exceeds budget")
+        ok = False
+
+    if heavy:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(heavy)}")
+        ok = False
+
+    if ok:
+        print("OK")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Upstream request metrics, per host and endpoint, in OpenMetrics text format.
+
+Every request attempt `BaseAPI` sends is counted with its latency, outcome and response
+size. `write_metrics()` exports the totals, latency histograms and p50/p95/p99 after a
+build, for tracking upstream regressions over time.
+"""
+
+import copy
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, List, Tuple
+
+from utils.constants import METRICS_LATENCY_BUCKETS, METRICS_MAX_SAMPLES
+from utils.logging import Log
+from utils.paths import write_atomic
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@dataclass
+class _Series:
+    requests: int = 0
+    errors: int = 0
+    response_bytes: int = 0
+    latency_sum: float = 0.0
+    bucket_counts: List[int] = field(default_factory=lambda: [0] * len(METRICS_LATENCY_BUCKETS))
+    # Most recent latencies, for quantiles
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=METRICS_MAX_SAMPLES))
+
+    def add(self, seconds: float, ok: bool, size: int):
+        self.requests += 1
+        self.errors += 0 if ok else 1
+        self.response_bytes += size
+        self.latency_sum += seconds
+        self.samples.append(seconds)
+        for index, bound in enumerate(METRICS_LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[index] += 1
+
+
+_series: Dict[Tuple[str, str], _Series] = {}
+_lock = threading.Lock()
+
+
+def record_request(host: str, endpoint: str, seconds: float, ok: bool, size: int = 0):
+    """Count one request attempt to an upstream host."""
+    with _lock:
+        _series.setdefault((host, endpoint), _Series()).add(seconds, ok, size)
+
+
+def _quantile(samples: List[float], quantile: float) -> float:
+    """Nearest-rank quantile of sorted samples."""
+    if not samples:
+        return math.nan
+    return samples[min(len(samples) - 1, max(0, math.ceil(quantile * len(samples)) - 1))]
+
+
+def _number(value: float) -> str:
+    """A sample value, with the spellings OpenMetrics requires for non-finite ones."""
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return f"{value:.6f}"
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _summary(name: str, rows: Iterable[Tuple[Dict[str, str], _Series]]) -> List[str]:
+    lines = [f"# TYPE {name} summary", f"# UNIT {name} seconds"]
+    for labels, series in rows:
+        samples = series.samples
+        ordered = sorted(samples)
+        for quantile in QUANTILES:
+            value = _quantile(ordered, quantile)
+            lines.append(f"{name}{_labels(**labels, quantile=str(quantile))} {_number(value)}")
+        lines.append(f"{name}_sum{_labels(**labels)} {_number(series.latency_sum)}")
+        lines.append(f"{name}_count{_labels(**labels)} {series.requests}")
+    return lines
+
+
+def format_metrics() -> str:
+    """Render all collected metrics in OpenMetrics text format."""
+    with _lock:
+        series = {key: copy.deepcopy(values) for key, values in sorted(_series.items())}
+
+    lines = []
+
+    for name, attribute, help_text in (
+        ("salo_upstream_requests", "requests", "Request attempts sent upstream"),
+        ("salo_upstream_errors", "errors", "Request attempts that failed or got an error status"),
+        ("salo_upstream_response_bytes", "response_bytes", "Response body bytes received"),
+    ):
+        lines += [f"# TYPE {name} counter", f"# HELP {name} {help_text}"]
+        if attribute == "response_bytes":
+            lines.append(f"# UNIT {name} bytes")
+        for (host, endpoint), values in series.items():
+            value = getattr(values, attribute)
+            lines.append(f"{name}_total{_labels(host=host, endpoint=endpoint)} {value}")
+
+    name = "salo_upstream_request_duration_seconds"
+    lines += [f"# TYPE {name} histogram", f"# UNIT {name} seconds"]
+    for (host, endpoint), values in series.items():
+        labels = {"host": host, "endpoint": endpoint}
+        for bound, count in zip(METRICS_LATENCY_BUCKETS, values.bucket_counts):
+            lines.append(f"{name}_bucket{_labels(**labels, le=str(float(bound)))} {count}")
+        lines.append(f'{name}_bucket{_labels(**labels, le="+Inf")} {values.requests}')
+        lines.append(f"{name}_count{_labels(**labels)} {values.requests}")
+        lines.append(f"{name}_sum{_labels(**labels)} {_number(values.latency_sum)}")
+
+    lines += _summary(
+        "salo_upstream_endpoint_latency_seconds",
+        (
+            ({"host": host, "endpoint": endpoint}, values)
+            for (host, endpoint), values in series.items()
+        ),
+    )
+
+    per_host: Dict[str, _Series] = {}
+    for (host, _), values in series.items():
+        total = per_host.setdefault(host, _Series(samples=deque()))
+        total.requests += values.requests
+        total.latency_sum += values.latency_sum
+        total.samples.extend(values.samples)
+    lines += _summary(
+        "salo_upstream_host_latency_seconds",
+        (({"host": host}, values) for host, values in per_host.items()),
+    )
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(output_file: str):
+    """Write the collected metrics to a file, replacing its previous content."""
+    write_atomic(output_file, format_metrics().encode("utf-8"))
+    Log.info(f"Metrics written to {output_file}")
@@ -1,6 +1,7 @@
 """Path utilities for the Salo.fyi ETL pipeline."""
 
 import os
+import tempfile
 from pathlib import Path
 from typing import Optional
 
@@ -23,6 +24,26 @@ def config_exists(runner_name: str, config_dir: str = DEFAULT_CONFIG_DIR) -> boo
     return os.path.exists(get_config_path(runner_name, config_dir))
 
 
+def write_atomic(path: str, data: bytes):
+    """
+    Write a file so that readers only ever see the old or the complete new content.
+
+    Data goes to a hidden temporary file next to the target, which then replaces it.
+    """
+    directory = os.path.dirname(path) or "."
+    Path(directory).mkdir(parents=True, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
 def get_app_index_path(app_name: str, output_dir: str = DEFAULT_OUTPUT_DIR) -> str:
     """Get the index.html path for an app."""
     return os.path.join(output_dir, app_name, "index.html")
@@ -0,0 +1,74 @@
+"""Per-host request rate and concurrency limits, so parallel fetches stay friendly."""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class HostLimiter:
+    """
+    Token bucket of `rate` requests per second, holding at most `burst` tokens, plus a
+    cap of `max_concurrency` requests in flight. Either limit can be None to disable it.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        rate: Optional[float],
+        burst: int,
+        max_concurrency: Optional[int],
+    ):
+        self.host = host
+        self.rate = rate
+        self.burst = max(1, burst)
+
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._semaphore = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+
+    def _reserve(self) -> float:
+        """Take a token, possibly ahead of time. Returns how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    @contextmanager
+    def slot(self) -> Iterator[float]:
+        """Wait until a request may be sent, and hold a concurrency slot while it runs.
+
+        Yields the seconds spent waiting.
+        """
+        started = time.monotonic()
+
+        if self._semaphore:
+            self._semaphore.acquire()
+        try:
+            if self.rate:
+                delay = self._reserve()
+                if delay:
+                    time.sleep(delay)
+
+            yield time.monotonic() - started
+        finally:
+            if self._semaphore:
+                self._semaphore.release()
+
+
+_limiters: Dict[str, HostLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_host_limiter(
+    host: str, rate: Optional[float], burst: int, max_concurrency: Optional[int]
+) -> HostLimiter:
+    """Get the process-wide limiter of a host, created with the given settings on first use."""
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = HostLimiter(host, rate, burst, max_concurrency)
+        return _limiters[host]
@@ -1,9 +1,10 @@
 import os
-from pathlib import Path
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from utils.logging import Log
+from utils.paths import write_atomic
+from utils.tracing import span
 
 jinja = Environment(loader=FileSystemLoader([".", "templates"]), autoescape=select_autoescape())
 
@@ -14,8 +15,9 @@ jinja = Environment(loader=FileSystemLoader([".", "templates"]), autoescape=sele
 
 
 def render_html(data, template_path: str, auto_refresh_minutes=None):
-    template = jinja.get_template(template_path)
-    return template.render(data=data, auto_refresh_minutes=auto_refresh_minutes)
+    with span("render", template=template_path):
+        template = jinja.get_template(template_path)
+        return template.render(data=data, auto_refresh_minutes=auto_refresh_minutes)
 
 
 def render_stdout(data, params=None):
@@ -23,11 +25,8 @@ def render_stdout(data, params=None):
 
 
 def save_file(output_file: str, data: str):
-    # Ensure parent dir exists.
-    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
-
-    with open(output_file, "w") as file:
-        file.write(data)
+    with span("write", file=output_file):
+        write_atomic(output_file, data.encode("utf-8"))
 
     Log.info("Rendered file saved to %s", output_file)
 
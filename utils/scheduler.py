@@ -0,0 +1,117 @@
+"""
+Long-running scheduler that keeps one warm interpreter around.
+
+Imports, the Jinja environment and other module-level state are set up once,
+and each runner is executed on its own schedule: shortly before the minutes
+at which its page auto-refreshes in the browser.
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from utils.logging import Log
+from utils.constants import (
+    DEFAULT_SCHEDULE_MINUTES,
+    DEFAULT_SCHEDULER_LEAD_SECONDS,
+    SCHEDULER_MAX_SLEEP_SECONDS,
+)
+
+
+def next_run_time(refresh_minutes: Iterable[int], lead: timedelta, now: datetime) -> datetime:
+    """Next time after `now` that is `lead` before one of the given minutes past the hour."""
+    hour = now.replace(minute=0, second=0, microsecond=0)
+
+    candidates = [
+        hour + timedelta(hours=offset, minutes=minute) - lead
+        for offset in range(3)
+        for minute in refresh_minutes
+    ]
+
+    return min(candidate for candidate in candidates if candidate > now)
+
+
+def serve_scheduler(
+    jobs: int = 1,
+    lead_seconds: int = DEFAULT_SCHEDULER_LEAD_SECONDS,
+    default_minutes: List[int] = DEFAULT_SCHEDULE_MINUTES,
+    metrics_file: Optional[str] = None,
+):
+    """Build everything once, then keep executing each runner on its schedule until interrupted."""
+    from config import (
+        resolve_all_runners,
+        list_runners,
+        get_runner_info,
+        get_cli_context,
+        execute_runners,
+    )
+    from utils.paths import config_exists
+    from utils.cachemanager import maintain_cache
+    from utils.connections import close_connection_pools
+    from utils.metrics import write_metrics
+
+    resolve_all_runners()
+
+    config_dir = get_cli_context().config_dir
+    refresh_minutes: Dict[str, Iterable[int]] = {}
+
+    for runner_name in list_runners().keys():
+        runner_info = get_runner_info(runner_name)
+        if not runner_info:
+            continue
+
+        if not config_exists(runner_name, config_dir):
+            Log.warning(f"Not scheduling runner '{runner_name}': no config in {config_dir}")
+            continue
+
+        refresh_minutes[runner_name] = runner_info.refresh_minutes or default_minutes
+
+    if not refresh_minutes:
+        Log.error("No runners to schedule")
+        return
+
+    lead = timedelta(seconds=lead_seconds)
+
+    try:
+        Log.info("Building all scheduled runners before entering the schedule...")
+        execute_runners(list(refresh_minutes.keys()), jobs)
+        maintain_cache()
+        if metrics_file:
+            write_metrics(metrics_file)
+
+        now = datetime.now()
+        schedule = {
+            name: next_run_time(minutes, lead, now) for name, minutes in refresh_minutes.items()
+        }
+        _log_schedule(schedule)
+
+        while True:
+            now = datetime.now()
+            due = [name for name, run_at in schedule.items() if run_at <= now]
+
+            if due:
+                Log.info(f"Scheduled runners due: {', '.join(due)}")
+                execute_runners(due, jobs)
+                maintain_cache()
+                if metrics_file:
+                    write_metrics(metrics_file)
+
+                now = datetime.now()
+                for name in due:
+                    schedule[name] = next_run_time(refresh_minutes[name], lead, now)
+                _log_schedule({name: schedule[name] for name in due})
+                continue
+
+            # Wake up regularly anyway, so clock jumps (e.g. after suspend) are noticed.
+            wait = (min(schedule.values()) - now).total_seconds()
+            time.sleep(max(0.0, min(wait, SCHEDULER_MAX_SLEEP_SECONDS)))
+
+    except KeyboardInterrupt:
+        Log.info("Scheduler stopped, thanks for the ride!")
+    finally:
+        close_connection_pools()
+
+
+def _log_schedule(schedule: Dict[str, datetime]):
+    for name, run_at in sorted(schedule.items(), key=lambda item: item[1]):
+        Log.info(f"Next run of '{name}' at {run_at.strftime('%H:%M:%S')}")
@@ -0,0 +1,69 @@
+"""Coalescing of identical concurrent calls, so only one of them does the work."""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.results = []
+        self.error = None
+
+
+class SingleFlight:
+    """
+    While a call for a key is in flight, further calls for the same key wait for it
+    instead of running again. Each waiter gets its own `copy` of the result, so callers
+    never share mutable data.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def waiters(self, key: Hashable) -> int:
+        """Number of calls waiting for the one in flight for the key, or -1 if there is none."""
+        with self._lock:
+            call = self._calls.get(key)
+            return call.waiters if call else -1
+
+    def do(
+        self, key: Hashable, function: Callable[[], Any], copy: Callable[[Any], Any] = lambda r: r
+    ) -> Tuple[Any, bool]:
+        """
+        Run `function`, or wait for the identical call already in flight.
+
+        Returns:
+            The result, and whether it was shared from another call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error:
+                raise call.error
+            return call.results.pop(), True
+
+        try:
+            result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            # No more waiters can join once the call is removed.
+            with self._lock:
+                del self._calls[key]
+
+            if call.error is None:
+                call.results = [copy(result) for _ in range(call.waiters)]
+            call.done.set()
+
+        return result, False
@@ -0,0 +1,86 @@
+"""
+Timing spans in Chrome trace-event format.
+
+Load the written file in chrome://tracing or https://ui.perfetto.dev to view a
+whole build as a flame chart, one row per thread.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List
+
+from utils.logging import Log
+
+_enabled = False
+_events: List[Dict[str, Any]] = []
+_thread_names: Dict[int, str] = {}
+_lock = threading.Lock()
+_epoch = time.perf_counter()
+
+
+def enable_tracing():
+    """Start recording spans. Until called, `span()` costs next to nothing."""
+    global _enabled
+    _enabled = True
+
+
+@contextmanager
+def span(name: str, category: str = "phase", **args):
+    """
+    Record the duration of the wrapped block as a complete ("X") trace event.
+
+    Yields the event's args dict, so the block can attach results like status codes.
+    """
+    if not _enabled:
+        yield args
+        return
+
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        end = time.perf_counter()
+        thread = threading.current_thread()
+
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - _epoch) * 1_000_000,
+            "dur": (end - start) * 1_000_000,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": args,
+        }
+
+        with _lock:
+            _events.append(event)
+            _thread_names[thread.ident] = thread.name
+
+
+def write_trace(output_file: str):
+    """Write all recorded spans to a JSON file in Chrome trace-event format."""
+    with _lock:
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in _thread_names.items()
+        ]
+        trace = {"traceEvents": metadata + _events, "displayTimeUnit": "ms"}
+
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "w") as file:
+        json.dump(trace, file, default=str)
+
+    Log.info(
+        "Trace with %d spans saved to %s", len(trace["traceEvents"]) - len(metadata), output_file
+    )
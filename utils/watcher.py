@@ -19,7 +19,7 @@ from utils.constants import (
     DEFAULT_OUTPUT_DIR,
     DEFAULT_CACHE_DIR,
 )
-from config import list_runners
+from config import list_runners, get_cli_context
 
 
 class RunnerFileWatcher(FileSystemEventHandler):
@@ -98,12 +98,12 @@ class RunnerFileWatcher(FileSystemEventHandler):
         runners_to_execute = self.pending_runners.copy()
         self.pending_runners.clear()
 
-        from config import CLI_CONTEXT
+        config_dir = get_cli_context().config_dir
 
         for runner_name in sorted(runners_to_execute):
-            config_path = get_config_path(runner_name, CLI_CONTEXT.config_dir)
+            config_path = get_config_path(runner_name, config_dir)
 
-            if config_exists(runner_name, CLI_CONTEXT.config_dir):
+            if config_exists(runner_name, config_dir):
                 Log.info(f"Auto-executing runner: {runner_name}")
                 success = execute_runner(runner_name, config_path)
 
@@ -1,4 +1,5 @@
-from utils.baseapi import BaseAPI
+from utils.asyncapi import AsyncBaseAPI
+from utils.baseapi import ApiResponse, BaseAPI
 from utils.logging import Log
 
 import xml.etree.ElementTree as ET
@@ -8,6 +9,8 @@ from typing import List, Dict, Any
 class RSSFetcher(BaseAPI):
     """RSS feed fetcher that extends BaseAPI."""
 
+    http_cache = True
+
     def __init__(self, rss_url: str):
         super().__init__("", headers={"Accept": "application/xml,text/xml,*/*"})
         self.rss_url = rss_url
@@ -15,10 +18,18 @@ class RSSFetcher(BaseAPI):
     def fetch_rss(self) -> List[Dict[str, Any]]:
         """Fetch and parse RSS feed."""
         response = self.request("GET", self.rss_url, useJSON=False)
+        return self._parse_rss(response)
+
+    async def fetch_rss_async(self) -> List[Dict[str, Any]]:
+        """Fetch and parse RSS feed without blocking the event loop."""
+        response = await AsyncBaseAPI.from_client(self).request("GET", self.rss_url, useJSON=False)
+        return self._parse_rss(response)
 
+    def _parse_rss(self, response: ApiResponse) -> List[Dict[str, Any]]:
+        """Parse RSS 2.0 items from a feed response."""
         if not response.ok:
-            Log.error(f"Failed to fetch RSS from {self.rss_url}: {response.status}")
-            return []
+            # Raise so a cached copy of the feed is used instead of an empty one.
+            raise RuntimeError(f"Failed to fetch RSS from {self.rss_url}: {response.status}")
 
         try:
             root = ET.fromstring(response.data)
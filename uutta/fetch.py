@@ -1,17 +1,32 @@
+import asyncio
+from datetime import timedelta
+from typing import List
+
+from utils.asyncapi import run_sync
+from utils.cache import cache_output
+
 from .config import UuttaConfig
-from .schema import RawRSSData
+from .schema import RawData, RawRSSData
 from .api import RSSFetcher
 
 
-def fetch_sss_rss(params: UuttaConfig) -> RawRSSData:
-    """Fetch articles from SSS.fi RSS feed."""
-    fetcher = RSSFetcher(params.sss_rss_url)
-    articles = fetcher.fetch_rss()
+async def _fetch_rss(rss_url: str) -> RawRSSData:
+    fetcher = RSSFetcher(rss_url)
+    articles = await fetcher.fetch_rss_async()
     return RawRSSData(articles=articles)
 
 
-def fetch_salo_rss(params: UuttaConfig) -> RawRSSData:
-    """Fetch articles from Salo tiedotteet RSS feed."""
-    fetcher = RSSFetcher(params.salo_rss_url)
-    articles = fetcher.fetch_rss()
-    return RawRSSData(articles=articles)
+async def _fetch_all_rss(rss_urls: List[str]) -> List[RawRSSData]:
+    return list(await asyncio.gather(*(_fetch_rss(url) for url in rss_urls)))
+
+
+@cache_output(
+    "uutta_rss",
+    RawData,
+    ttl=timedelta(minutes=10),
+    key=lambda params: [params.sss_rss_url, params.salo_rss_url],
+)
+def fetch_all_rss(params: UuttaConfig) -> RawData:
+    """Fetch articles from SSS.fi and Salo tiedotteet RSS feeds concurrently."""
+    sss, salo = run_sync(_fetch_all_rss([params.sss_rss_url, params.salo_rss_url]))
+    return RawData(sss=sss, salo=salo)
@@ -3,26 +3,31 @@ import os
 
 from config import register_runner, get_output_dir
 from utils.renderers import render_html, save_file
+from utils.tracing import span
 
 from .config import UuttaConfig
-from .fetch import fetch_sss_rss, fetch_salo_rss
+from .fetch import fetch_all_rss
 from .transform import transform_articles
 
+# Minutes past each hour at which the page reloads itself in the browser.
+AUTO_REFRESH_MINUTES = [5, 25, 45]
 
-@register_runner("uutta", UuttaConfig, "Local news aggregator")
+
+@register_runner("uutta", UuttaConfig, refresh_minutes=AUTO_REFRESH_MINUTES)
 def run_uutta(params: UuttaConfig) -> None:
     """Fetch, process and render local news articles"""
 
     # 1. Fetch raw RSS data from both sources
-    sss_data = fetch_sss_rss(params)
-    salo_data = fetch_salo_rss(params)
+    with span("fetch"):
+        raw_data = fetch_all_rss(params)
 
     # 2. Transform and combine articles from both sources
-    transformed_data = transform_articles(sss_data.articles, salo_data.articles, params)
+    with span("transform"):
+        transformed_data = transform_articles(raw_data.sss.articles, raw_data.salo.articles, params)
 
     # 3. Render news HTML page
     template_path = "uutta/templates/template.html"
-    html = render_html(transformed_data, template_path, auto_refresh_minutes=[5, 25, 45])
+    html = render_html(transformed_data, template_path, auto_refresh_minutes=AUTO_REFRESH_MINUTES)
 
     # Use CLI output directory + runner name
     output_dir = os.path.join(get_output_dir(), "uutta")
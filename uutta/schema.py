@@ -6,3 +6,10 @@ class RawRSSData(BaseModel):
     """Contains raw RSS feed data."""
 
     articles: List[Dict[str, Any]]
+
+
+class RawData(BaseModel):
+    """Contains raw data of all RSS feeds."""
+
+    sss: RawRSSData
+    salo: RawRSSData